@@ -0,0 +1,269 @@
+"""Load generator for the API's upstream-backed endpoints.
+
+Drives /api/games, /standings, /api/nba/player/{id}/season-stats,
+/insights/player/{id} (and optionally /predict/player/{id} and the
+streaming /insights/player/{id}/stream and /predict/batch/stream) with a fixed
+number of concurrent clients for a fixed time, then reports throughput and
+p50/p95/p99 latency per endpoint, plus how many calls reached the upstream
+stub. Nothing touches stats.nba.com or Gemini.
+
+From backend/:
+
+    # Start the stub and the app (uvicorn main:app) as subprocesses
+    python -m benchmarks.load --spawn --concurrency 32 --duration 30
+
+    # Slow, flaky upstream: 800ms ± 200ms everywhere, 10% 429s on the scoreboard
+    python -m benchmarks.load --spawn --fault default:latency_ms=800,jitter_ms=200 \\
+        --fault scoreboardv3:rate_limit_rate=0.1
+
+    # Against an app and stub that are already running
+    python -m benchmarks.load --url http://127.0.0.1:8000 --stub-url http://127.0.0.1:9000
+
+--mix sets the relative weight of each endpoint (games, standings,
+season_stats, insights, predict, insights_stream, predict_stream); streamed
+responses are timed to the end of the stream. --players sets how many distinct player
+IDs season-stats and insights cycle through (more IDs, more cache misses).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "games=1,standings=1,season_stats=2,insights=1"
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    def report(self, elapsed: float) -> dict:
+        ms = np.asarray(self.latencies) * 1000.0
+        ok = sum(n for status, n in self.statuses.items() if status.startswith("2"))
+        out = {
+            "requests": len(self.latencies),
+            "ok": ok,
+            "statuses": dict(sorted(self.statuses.items())),
+            "throughput_rps": round(len(self.latencies) / elapsed, 1),
+        }
+        if len(ms):
+            out.update({
+                "p50_ms": round(float(np.percentile(ms, 50)), 1),
+                "p95_ms": round(float(np.percentile(ms, 95)), 1),
+                "p99_ms": round(float(np.percentile(ms, 99)), 1),
+                "max_ms": round(float(ms.max()), 1),
+            })
+        return out
+
+
+def insights_payload(player_id: int) -> dict:
+    """What the frontend sends for a player: the same until their data changes."""
+    rng = random.Random(player_id)
+    games = [
+        {"date": f"2024-03-{day:02d}", "pts": rng.randint(10, 40), "min": rng.randint(25, 40), "fg_pct": round(rng.uniform(0.35, 0.6), 3)}
+        for day in range(1, 6)
+    ]
+    return {"predicted_points": round(rng.uniform(12, 32), 1), "recent_games": games}
+
+
+class Driver:
+    def __init__(self, base_url: str, mix: Dict[str, float], player_ids: List[int], concurrency: int, duration: float, seed: int = 0):
+        self.base_url = base_url.rstrip("/")
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.player_ids = player_ids
+        self.concurrency = concurrency
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in self.names}
+
+    def request_for(self, name: str) -> Tuple[str, str, Optional[dict]]:
+        pid = self.rng.choice(self.player_ids)
+        if name == "games":
+            return "GET", "/api/games", None
+        if name == "standings":
+            return "GET", "/standings", None
+        if name == "season_stats":
+            return "GET", f"/api/nba/player/{pid}/season-stats", None
+        if name == "insights":
+            return "POST", f"/insights/player/{pid}", insights_payload(pid)
+        if name == "predict":
+            return "POST", f"/predict/player/{pid}", None
+        if name == "insights_stream":
+            return "POST", f"/insights/player/{pid}/stream", insights_payload(pid)
+        if name == "predict_stream":
+            return "POST", "/predict/batch/stream", {"player_ids": self.rng.sample(self.player_ids, min(16, len(self.player_ids)))}
+        raise ValueError(f"unknown endpoint {name!r}")
+
+    async def _worker(self, client: httpx.AsyncClient, deadline: float):
+        while time.monotonic() < deadline:
+            name = self.rng.choices(self.names, self.weights)[0]
+            method, path, body = self.request_for(name)
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=body)
+                status = str(resp.status_code)
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            stats = self.stats[name]
+            stats.latencies.append(time.perf_counter() - start)
+            stats.statuses[status] += 1
+
+    async def run(self) -> float:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=60.0) as client:
+            start = time.monotonic()
+            await asyncio.gather(*(self._worker(client, start + self.duration) for _ in range(self.concurrency)))
+            return time.monotonic() - start
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for item in filter(None, text.split(",")):
+        name, _, weight = item.partition("=")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{' '.join(proc.args)} exited with {proc.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def spawn(workers: int) -> Tuple[str, str, List[subprocess.Popen]]:
+    """Start the stub and the app on free ports; returns (app_url, stub_url, processes)."""
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    env = {
+        **os.environ,
+        "NBA_STATS_BASE_URL": f"{stub_url}/stats",
+        "GEMINI_API_URL": f"{stub_url}/gemini/generate",
+        "GEMINI_STREAM_URL": f"{stub_url}/gemini/stream",
+        "GEMINI_API_KEY": "stub",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    }
+    procs = [subprocess.Popen([sys.executable, "-m", "benchmarks.nba_stub", "--port", str(stub_port)], cwd=BACKEND_DIR, env=env)]
+    _wait_ready(f"{stub_url}/_stub/stats", procs[0])
+    procs.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    ))
+    app_url = f"http://127.0.0.1:{app_port}"
+    _wait_ready(app_url, procs[1])
+    return app_url, stub_url, procs
+
+
+def configure_stub(stub_url: str, faults: List[str]):
+    from benchmarks.nba_stub import parse_fault
+
+    config = {"endpoints": {}}
+    for item in faults:
+        endpoint, _, settings = item.partition(":")
+        values = parse_fault(settings)
+        if endpoint == "default":
+            config["default"] = values
+        else:
+            config["endpoints"][endpoint] = values
+    httpx.put(f"{stub_url}/_stub/faults", json=config).raise_for_status()
+
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':<14} {'reqs':>7} {'ok':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<14} {r['requests']:>7} {r['ok']:>7} {r['throughput_rps']:>8.1f} "
+              f"{r.get('p50_ms', 0):>9.1f} {r.get('p95_ms', 0):>9.1f} {r.get('p99_ms', 0):>9.1f}  {r['statuses']}")
+    print(f"{'total':<14} {report['total_requests']:>7} {'':>7} {report['throughput_rps']:>8.1f}")
+    if report.get("upstream_calls"):
+        print("\nupstream calls (stub):")
+        for endpoint, counts in report["upstream_calls"].items():
+            print(f"  {endpoint:<20} {counts}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API against the local upstream stub.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="app base URL (ignored with --spawn)")
+    parser.add_argument("--stub-url", help="stub base URL, for faults and upstream call counts")
+    parser.add_argument("--spawn", action="store_true", help="start the stub and the app as subprocesses")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--players", type=int, default=100, help="distinct player IDs to request")
+    parser.add_argument("--fault", action="append", default=[], metavar="ENDPOINT:SETTINGS",
+                        help="stub faults, e.g. default:latency_ms=500 or gemini:error_rate=0.2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    procs: List[subprocess.Popen] = []
+    base_url, stub_url = args.url, args.stub_url
+    try:
+        if args.spawn:
+            base_url, stub_url, procs = spawn(args.workers)
+        if stub_url:
+            if args.fault:
+                configure_stub(stub_url, args.fault)
+            httpx.delete(f"{stub_url}/_stub/stats").raise_for_status()
+        elif args.fault:
+            parser.error("--fault needs --spawn or --stub-url")
+
+        players = httpx.get(f"{base_url}/players", timeout=30).json()
+        player_ids = [p["player_id"] for p in players][: args.players] or list(range(1, args.players + 1))
+        driver = Driver(base_url, parse_mix(args.mix), player_ids, args.concurrency, args.duration, args.seed)
+        for name in driver.names:
+            driver.request_for(name)  # reject unknown names before starting
+        elapsed = asyncio.run(driver.run())
+
+        total = sum(len(s.latencies) for s in driver.stats.values())
+        report = {
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "mix": parse_mix(args.mix),
+            "total_requests": total,
+            "throughput_rps": round(total / elapsed, 1),
+            "endpoints": {name: s.report(elapsed) for name, s in driver.stats.items()},
+        }
+        if stub_url:
+            report["faults"] = httpx.get(f"{stub_url}/_stub/faults").json()
+            report["upstream_calls"] = httpx.get(f"{stub_url}/_stub/stats").json()
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""Local stand-in for stats.nba.com and the Gemini generate endpoint.
+
+Serves, with synthetic data (benchmarks/synthetic.py) in the same
+`resultSets` shape as stats.nba.com:
+
+* dataset build: LeagueDashPlayerStats, LeagueDashTeamStats, PlayerGameLog
+* request time: ScoreboardV3, LeagueStandingsV3, PlayerCareerStats
+* POST /gemini/generate, answering in the `candidates` shape main.py parses,
+  and POST /gemini/stream, sending the same text as SSE chunks a few words
+  at a time (STREAM_CHUNK_DELAY_MS apart)
+
+Every endpoint can be slowed down or made to fail: a base latency plus
+jitter, and a probability of answering 500 or 429, set for all endpoints or
+per endpoint, on the command line or at runtime through PUT /_stub/faults.
+GET /_stub/stats counts requests and injected faults per endpoint, i.e. how
+many calls the app's caches let through.
+
+Point the app at it with
+
+    NBA_STATS_BASE_URL=http://127.0.0.1:9000/stats
+    GEMINI_API_URL=http://127.0.0.1:9000/gemini/generate GEMINI_API_KEY=stub
+    GEMINI_STREAM_URL=http://127.0.0.1:9000/gemini/stream
+
+and, for the dataset build, NBA_API_RATE=1000 NBA_API_CACHE_DIR= (a high rate
+so the token bucket does not dominate, no response cache so every run hits
+the stub). Run standalone with:
+
+    python -m benchmarks.nba_stub --port 9000 --latency-ms 300 --jitter-ms 100 \\
+        --error-rate 0.02 --fault scoreboardv3:latency_ms=2000,rate_limit_rate=0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+import uvicorn
+from fastapi import Body, FastAPI, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from nba_api.stats.endpoints import leaguedashplayerstats, leaguedashteamstats, leaguestandingsv3, playercareerstats
+from nba_api.stats.static import players, teams
+
+from benchmarks import synthetic
+
+# Number of players LeagueDashPlayerStats returns (the build keeps the top 50)
+LEAGUE_PLAYERS = 120
+GAMES_PER_DATE = 6
+STREAM_CHUNK_WORDS = 4
+STREAM_CHUNK_DELAY_MS = 60.0
+
+
+@dataclass
+class FaultSpec:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+
+def parse_fault(text: str) -> Dict[str, float]:
+    """Parse "latency_ms=200,error_rate=0.1" into FaultSpec field values."""
+    names = {f.name for f in fields(FaultSpec)}
+    values = {}
+    for item in filter(None, text.split(",")):
+        name, _, value = item.partition("=")
+        if name not in names:
+            raise ValueError(f"unknown fault setting {name!r} (expected one of {', '.join(sorted(names))})")
+        values[name] = float(value)
+    return values
+
+
+class Faults:
+    """Latency and error injection, with per-endpoint overrides and counters."""
+
+    def __init__(self, default: Optional[FaultSpec] = None, endpoints: Optional[Dict[str, FaultSpec]] = None, seed: int = 0):
+        self.default = default or FaultSpec()
+        self.endpoints = dict(endpoints or {})
+        self.stats: Dict[str, Counter] = {}
+        self._rng = random.Random(seed)
+
+    def spec(self, endpoint: str) -> FaultSpec:
+        return self.endpoints.get(endpoint, self.default)
+
+    def update(self, config: dict):
+        """Apply {"default": {...}, "endpoints": {name: {...}}}; unset fields keep their value."""
+        if "default" in config:
+            self.default = replace(self.default, **config["default"])
+        for endpoint, values in config.get("endpoints", {}).items():
+            self.endpoints[endpoint] = replace(self.spec(endpoint), **values)
+
+    def describe(self) -> dict:
+        return {"default": asdict(self.default), "endpoints": {k: asdict(v) for k, v in self.endpoints.items()}}
+
+    async def apply(self, endpoint: str) -> Optional[JSONResponse]:
+        """Wait out the injected latency; return an error response if one is rolled."""
+        spec = self.spec(endpoint)
+        counts = self.stats.setdefault(endpoint, Counter())
+        counts["requests"] += 1
+        delay = spec.latency_ms + (self._rng.uniform(-spec.jitter_ms, spec.jitter_ms) if spec.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        roll = self._rng.random()
+        if roll < spec.rate_limit_rate:
+            counts["http_429"] += 1
+            return JSONResponse({"message": "Too Many Requests"}, status_code=429)
+        if roll < spec.rate_limit_rate + spec.error_rate:
+            counts["http_500"] += 1
+            return JSONResponse({"message": "Internal Server Error"}, status_code=500)
+        counts["ok"] += 1
+        return None
+
+
+def result_set(name: str, frame: pd.DataFrame) -> dict:
+    rows = frame.astype(object).where(frame.notna(), None).values.tolist()
+    return {"name": name, "headers": list(frame.columns), "rowSet": rows}
+
+
+def nba_response(resource: str, parameters: dict, *sets: dict) -> dict:
+    return {"resource": resource, "parameters": parameters, "resultSets": list(sets)}
+
+
+def _blank(headers: List[str], n: int) -> pd.DataFrame:
+    return pd.DataFrame({h: [0] * n for h in headers})
+
+
+# -- dataset build endpoints ---------------------------------------------------
+
+def league_player_ids(n: int = LEAGUE_PLAYERS) -> List[int]:
+    """Real active player IDs, so the build's static-list filter keeps them."""
+    return [p["id"] for p in players.get_active_players()[:n]]
+
+
+def league_players_frame(season: str) -> pd.DataFrame:
+    headers = leaguedashplayerstats.LeagueDashPlayerStats.expected_data["LeagueDashPlayerStats"]
+    ids = league_player_ids()
+    frame = _blank(headers, len(ids))
+    frame["PLAYER_ID"] = ids
+    # Strictly decreasing, so the top 50 is always the first 50 IDs
+    frame["PTS"] = [round(35.0 - i * 0.2, 1) for i in range(len(ids))]
+    frame["GP"] = synthetic.GAMES_PER_SEASON
+    return frame
+
+
+def team_stats_frame(season: str) -> pd.DataFrame:
+    # The build asks for MeasureType=Advanced, which adds DEF_RATING
+    headers = leaguedashteamstats.LeagueDashTeamStats.expected_data["LeagueDashTeamStats"] + ["DEF_RATING"]
+    ratings = synthetic.def_ratings(season)
+    frame = _blank(headers, len(ratings))
+    frame["TEAM_ID"] = list(ratings)
+    frame["DEF_RATING"] = list(ratings.values())
+    return frame
+
+
+def game_log_frame(player_id: int, season: str, date_from: Optional[str] = None) -> pd.DataFrame:
+    logs = synthetic.make_game_log(player_id, season)
+    if date_from:
+        since = datetime.strptime(date_from, "%m/%d/%Y")
+        logs = logs[pd.to_datetime(logs["GAME_DATE"], format=synthetic.CSV_DATE_FORMAT) >= since]
+    return logs
+
+
+# -- request-time endpoints ----------------------------------------------------
+
+def scoreboard(game_date: str) -> dict:
+    """ScoreboardV3 body for a YYYY-MM-DD date: a few games, final if in the past."""
+    day = date.fromisoformat(game_date)
+    rng = random.Random(day.toordinal())
+    pairs = rng.sample(teams.get_teams(), GAMES_PER_DATE * 2)
+    final = day < date.today()
+    games = []
+    for i in range(GAMES_PER_DATE):
+        home, away = pairs[2 * i], pairs[2 * i + 1]
+        games.append({
+            "gameId": f"00{day:%y%m%d}{i:02d}",
+            "gameStatusText": "Final" if final else "7:30 pm ET",
+            "gameTimeUTC": f"{game_date}T23:30:00Z",
+            "homeTeam": {"teamName": home["nickname"], "score": rng.randint(90, 130) if final else 0},
+            "awayTeam": {"teamName": away["nickname"], "score": rng.randint(90, 130) if final else 0},
+        })
+    return {"meta": {"version": 1}, "scoreboard": {"gameDate": game_date, "leagueId": "00", "games": games}}
+
+
+def standings_frame(season: str) -> pd.DataFrame:
+    headers = leaguestandingsv3.LeagueStandingsV3.expected_data["Standings"]
+    rng = random.Random(season)
+    all_teams = sorted(teams.get_teams(), key=lambda t: t["id"])
+    wins = [rng.randint(15, 60) for _ in all_teams]
+    frame = _blank(headers, len(all_teams))
+    frame["TeamID"] = [t["id"] for t in all_teams]
+    frame["TeamCity"] = [t["city"] for t in all_teams]
+    frame["TeamName"] = [t["nickname"] for t in all_teams]
+    frame["Conference"] = ["East" if i < len(all_teams) // 2 else "West" for i in range(len(all_teams))]
+    frame["WINS"] = wins
+    frame["LOSSES"] = [82 - w for w in wins]
+    frame["ConferenceGamesBack"] = "-"
+    frame["strCurrentStreak"] = [f"{rng.choice('WL')} {rng.randint(1, 6)}" for _ in all_teams]
+    return frame
+
+
+def career_frame(player_id: int) -> pd.DataFrame:
+    headers = playercareerstats.PlayerCareerStats.expected_data["SeasonTotalsRegularSeason"]
+    seasons = synthetic.SEASONS
+    rng = random.Random(player_id)
+    abbrevs = synthetic.team_abbrevs()
+    games = [rng.randint(50, 82) for _ in seasons]
+    frame = _blank(headers, len(seasons))
+    frame["PLAYER_ID"] = player_id
+    frame["SEASON_ID"] = seasons
+    frame["TEAM_ABBREVIATION"] = abbrevs[player_id % len(abbrevs)]
+    frame["GP"] = games
+    for col, lo, hi in (("MIN", 25, 36), ("PTS", 10, 30), ("REB", 3, 10), ("AST", 2, 8), ("STL", 0, 2), ("BLK", 0, 2)):
+        frame[col] = [g * rng.randint(lo, hi) for g in games]
+    for col, lo, hi in (("FG_PCT", 0.42, 0.55), ("FG3_PCT", 0.30, 0.42), ("FT_PCT", 0.70, 0.90)):
+        frame[col] = [round(rng.uniform(lo, hi), 3) for _ in seasons]
+    return frame
+
+
+def gemini_text(prompt: str) -> str:
+    games = sum(1 for line in prompt.splitlines() if " pts, " in line)
+    return "\n".join([
+        f"- Scored in each of the last {games} games with steady minutes.",
+        "- Form is consistent, with no sharp drop-off.",
+        "- Minutes are stable, supporting the projected total.",
+        "- Expect scoring close to the recent average.",
+    ])
+
+
+def create_app(faults: Optional[Faults] = None) -> FastAPI:
+    app = FastAPI(title="nba_api stub")
+    app.state.faults = faults = faults or Faults()
+
+    @app.get("/stats/leaguedashplayerstats")
+    async def leaguedash_players(Season: str = Query(...)):
+        error = await faults.apply("leaguedashplayerstats")
+        if error is not None:
+            return error
+        frame = league_players_frame(Season)
+        return nba_response("leaguedashplayerstats", {"Season": Season},
+                            result_set("LeagueDashPlayerStats", frame))
+
+    @app.get("/stats/leaguedashteamstats")
+    async def leaguedash_teams(Season: str = Query(...)):
+        error = await faults.apply("leaguedashteamstats")
+        if error is not None:
+            return error
+        frame = team_stats_frame(Season)
+        return nba_response("leaguedashteamstats", {"Season": Season},
+                            result_set("LeagueDashTeamStats", frame))
+
+    @app.get("/stats/playergamelog")
+    async def player_game_log(PlayerID: int = Query(...), Season: str = Query(...), DateFrom: str = ""):
+        error = await faults.apply("playergamelog")
+        if error is not None:
+            return error
+        frame = game_log_frame(PlayerID, Season, DateFrom)
+        return nba_response("playergamelog", {"PlayerID": PlayerID, "Season": Season},
+                            result_set("PlayerGameLog", frame))
+
+    @app.get("/stats/scoreboardv3")
+    async def scoreboard_v3(GameDate: str = Query(...)):
+        error = await faults.apply("scoreboardv3")
+        if error is not None:
+            return error
+        return scoreboard(GameDate)
+
+    @app.get("/stats/leaguestandingsv3")
+    async def league_standings(Season: str = Query(...)):
+        error = await faults.apply("leaguestandingsv3")
+        if error is not None:
+            return error
+        return nba_response("leaguestandingsv3", {"Season": Season}, result_set("Standings", standings_frame(Season)))
+
+    @app.get("/stats/playercareerstats")
+    async def player_career(PlayerID: int = Query(...)):
+        error = await faults.apply("playercareerstats")
+        if error is not None:
+            return error
+        return nba_response("playercareerstats", {"PlayerID": PlayerID},
+                            result_set("SeasonTotalsRegularSeason", career_frame(PlayerID)))
+
+    @app.post("/gemini/generate")
+    async def gemini_generate(body: dict = Body({})):
+        error = await faults.apply("gemini")
+        if error is not None:
+            return error
+        return {"candidates": [{"content": gemini_text(str(body.get("prompt", "")))}]}
+
+    @app.post("/gemini/stream")
+    async def gemini_stream(body: dict = Body({})):
+        # Injected latency is the time to the first chunk
+        error = await faults.apply("gemini_stream")
+        if error is not None:
+            return error
+        words = re.split(r"(?<= )", gemini_text(str(body.get("prompt", ""))))
+
+        async def chunks():
+            for i in range(0, len(words), STREAM_CHUNK_WORDS):
+                if i:
+                    await asyncio.sleep(STREAM_CHUNK_DELAY_MS / 1000.0)
+                piece = "".join(words[i:i + STREAM_CHUNK_WORDS])
+                yield f"data: {json.dumps({'candidates': [{'content': piece}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get("/_stub/stats")
+    async def stub_stats():
+        return {endpoint: dict(counts) for endpoint, counts in sorted(faults.stats.items())}
+
+    @app.delete("/_stub/stats")
+    async def reset_stub_stats():
+        faults.stats.clear()
+        return {}
+
+    @app.get("/_stub/faults")
+    async def get_faults():
+        return faults.describe()
+
+    @app.put("/_stub/faults")
+    async def put_faults(config: dict = Body(...)):
+        try:
+            faults.update(config)
+        except TypeError as e:
+            return JSONResponse({"detail": str(e)}, status_code=422)
+        return faults.describe()
+
+    return app
+
+
+class StubServer:
+    """Runs an ASGI app with uvicorn on a background thread."""
+
+    def __init__(self, app, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=self.port, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/stats"
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        self._thread = threading.Thread(target=self.server.run, name="nba-stub", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"stub server did not start on port {self.port}")
+            time.sleep(0.02)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for stats.nba.com and Gemini.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform ± on top of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of responses that are HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of responses that are HTTP 429")
+    parser.add_argument("--fault", action="append", default=[], metavar="ENDPOINT:SETTINGS",
+                        help="per-endpoint override, e.g. scoreboardv3:latency_ms=2000,error_rate=0.1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    default = FaultSpec(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+    endpoints = {}
+    for item in args.fault:
+        endpoint, _, settings = item.partition(":")
+        try:
+            endpoints[endpoint] = replace(default, **parse_fault(settings))
+        except ValueError as e:
+            parser.error(str(e))
+    app = create_app(Faults(default, endpoints, seed=args.seed))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
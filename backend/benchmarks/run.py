@@ -0,0 +1,337 @@
+"""Benchmark harness for the prediction, data loading and ingestion hot paths.
+
+Run from backend/:
+
+    python -m benchmarks.run                       # 1× and 10× data, all benches
+    python -m benchmarks.run --scales 1,10,100 --output bench-after.json
+    python -m benchmarks.run --only predict --compare bench-before.json
+
+Benches (each at every requested scale, 1× = 50 players × 3 seasons):
+
+* startup.csv_load      read_dataset_csv + compute_rolling_features
+* startup.index         PlayerIndex over the loaded frame
+* startup.columnar_load load_columnar (memory-mapped) + PlayerIndex
+* predict.single        one uncached prediction (predict_players([id]))
+* predict.batch         every player in one call, uncached (reports players/s)
+* predict.cached        POST /predict/player/{id} served from the cache
+* http.players          GET /players
+* http.players_304      GET /players revalidated with If-None-Match
+* http.recent_games     GET /player/{id}/recent-games
+* encode.<what>.<how>   JSON encoding alone, for a prediction payload and
+                        the /players catalog: "default" (jsonable_encoder +
+                        json.dumps, the path without a response_model),
+                        "model" (response_model validation + pydantic
+                        dump_json), "orjson" (FAST_JSON=1; if installed)
+* ingest.transform      transform_game_log_batch over every synthetic
+                        PlayerGameLog of a build, as the builds call it
+* ingest.build          build_raw_dataset end to end against the local
+                        nba_api stub (benchmarks/nba_stub.py); 1× only
+
+Results go to a JSON file (sorted keys, times in ms) meant to be kept per
+commit and diffed, or compared directly with --compare.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = BACKEND_DIR / "benchmarks" / "results.json"
+GROUPS = ("startup", "predict", "http", "encode", "ingest")
+
+
+def _configure_env(stub_url: str):
+    """Settings that must be in place before the app modules are imported."""
+    # nba_api → local stub, no token-bucket throttling, no response cache
+    os.environ["NBA_STATS_BASE_URL"] = stub_url
+    os.environ.setdefault("NBA_API_RATE", "1000")
+    os.environ["NBA_API_CACHE_DIR"] = ""
+    # Keep main.py from reloading the real dataset under the synthetic one
+    os.environ["ARTIFACT_CHECK_INTERVAL"] = "1e9"
+    os.environ["PREDICTION_CACHE_WARM"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def summarize(samples: List[float], items: int = 1) -> Dict[str, float]:
+    """Latency stats in ms (plus items/s when a sample covers several items)."""
+    ms = np.asarray(samples) * 1000.0
+    stats = {
+        "runs": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "min_ms": round(float(ms.min()), 3),
+    }
+    if items > 1:
+        stats["items"] = items
+        stats["items_per_s"] = round(items / float(np.median(samples)), 1)
+    return stats
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    """Time `fn` `repeat` times after `warmup` untimed calls; `setup` runs untimed before each."""
+    samples = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+@contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class Bench:
+    def __init__(self, scales: List[int], repeat: int, only: Optional[List[str]], workdir: Path):
+        self.scales = scales
+        self.repeat = repeat
+        self.only = only
+        self.workdir = workdir
+        self.results: Dict[str, dict] = {}
+
+    def wanted(self, group: str) -> bool:
+        return not self.only or group in self.only
+
+    def record(self, name: str, scale: int, stats: dict, **extra):
+        key = f"{name}@{scale}x"
+        self.results[key] = {**stats, **extra}
+        items = f"  {stats['items_per_s']:>10.1f}/s" if "items_per_s" in stats else ""
+        print(f"{key:<32} p50 {stats['p50_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms{items}", flush=True)
+
+    # -- startup -----------------------------------------------------------
+
+    def startup(self, scale: int, csv_path: Path):
+        from services.dataset_store import build_columnar, load_columnar, read_dataset_csv
+        from services.player_index import PlayerIndex
+        from services.preprocess import compute_rolling_features
+
+        loaded = {}
+
+        def load_csv():
+            loaded["df"] = compute_rolling_features(read_dataset_csv(csv_path))
+
+        self.record("startup.csv_load", scale, summarize(measure(load_csv, self.repeat)), rows=len(loaded["df"]))
+        self.record("startup.index", scale, summarize(measure(lambda: PlayerIndex(loaded["df"]), self.repeat)))
+
+        columnar_dir = self.workdir / f"columnar-{scale}x"
+        build_columnar(csv_path, columnar_dir)
+
+        def load_mapped():
+            data, meta = load_columnar(columnar_dir)
+            PlayerIndex(data, meta["players"])
+
+        self.record("startup.columnar_load", scale, summarize(measure(load_mapped, self.repeat)))
+
+    # -- prediction and HTTP -------------------------------------------------
+
+    def serving(self, scale: int, csv_path: Path):
+        import main
+        from fastapi.testclient import TestClient
+        from services.dataset_store import read_dataset_csv
+        from services.player_index import PlayerIndex
+        from services.preprocess import compute_rolling_features
+
+        # Swap the synthetic dataset in for the one main.py loaded at import
+        main.df = compute_rolling_features(read_dataset_csv(csv_path))
+        main.player_index = PlayerIndex(main.df)
+        # A new dataset version, so encoded /players and recent-games bodies are rebuilt
+        main._data_version = f"synthetic-{scale}"
+        main.prediction_cache.clear()
+        player_ids = [p["player_id"] for p in main.player_index.players]
+        sample = player_ids[:: max(1, len(player_ids) // 50)][:50]
+        client = TestClient(main.app)
+
+        if self.wanted("predict"):
+            single = []
+            for pid in sample:
+                single += measure(lambda: main.predict_players([pid]), self.repeat, setup=main.prediction_cache.clear)
+            self.record("predict.single", scale, summarize(single))
+
+            batch = measure(lambda: main.predict_players(player_ids), self.repeat, setup=main.prediction_cache.clear)
+            self.record("predict.batch", scale, summarize(batch, items=len(player_ids)))
+
+            main.predict_players(sample)
+            cached = measure(lambda: [client.post(f"/predict/player/{pid}") for pid in sample], self.repeat)
+            self.record("predict.cached", scale, summarize([s / len(sample) for s in cached]))
+
+        if self.wanted("http"):
+            self.record("http.players", scale, summarize(measure(lambda: client.get("/players"), self.repeat)),
+                        players=len(player_ids))
+            etag = {"If-None-Match": client.get("/players").headers["etag"]}
+            self.record("http.players_304", scale,
+                        summarize(measure(lambda: client.get("/players", headers=etag), self.repeat)))
+            recent = measure(lambda: [client.get(f"/player/{pid}/recent-games") for pid in sample], self.repeat)
+            self.record("http.recent_games", scale, summarize([s / len(sample) for s in recent]))
+
+        if self.wanted("encode"):
+            self.encode(scale, list(main.predict_players(sample).values()), main.player_index.players)
+
+    def encode(self, scale: int, payloads: List[dict], players: List[dict]):
+        from fastapi.encoders import jsonable_encoder
+        from pydantic import TypeAdapter
+
+        from schemas import Player, Prediction
+        from utils import fast_json
+
+        def default(data):
+            return json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+        def validated(adapter):
+            return lambda data: adapter.dump_json(adapter.validate_python(data))
+
+        # (prediction encoder, catalog encoder) per way of encoding
+        encoders = {
+            "default": (default, default),
+            "model": (validated(TypeAdapter(Prediction)), validated(TypeAdapter(List[Player]))),
+        }
+        if fast_json.orjson is not None:
+            def fast(data):
+                return fast_json.orjson.dumps(data, option=fast_json.ORJSON_OPTIONS)
+
+            encoders["orjson"] = (fast, fast)
+        for how, (encode_prediction, encode_catalog) in encoders.items():
+            per_payload = measure(lambda: [encode_prediction(p) for p in payloads], self.repeat)
+            self.record(f"encode.prediction.{how}", scale, summarize([s / len(payloads) for s in per_payload]))
+            self.record(f"encode.players.{how}", scale, summarize(measure(lambda: encode_catalog(players), self.repeat)),
+                        players=len(players))
+
+    # -- ingestion ----------------------------------------------------------
+
+    def ingest_transform(self, scale: int):
+        from benchmarks import synthetic
+        from services.nba_api_service import SEASONS, transform_game_log_batch
+
+        pids = [synthetic.FIRST_PLAYER_ID + i for i in range(synthetic.BASE_PLAYERS * scale)]
+        logs = {(season, pid): synthetic.make_game_log(pid, season) for season in SEASONS for pid in pids}
+        names = {pid: f"Player {pid}" for pid in pids}
+        ratings = {season: synthetic.def_ratings(season) for season in SEASONS}
+
+        def transform_all():
+            transform_game_log_batch(logs, names, ratings)
+
+        stats = summarize(measure(transform_all, self.repeat), items=len(logs))
+        self.record("ingest.transform", scale, stats)
+
+    def ingest_build(self):
+        from services import nba_api_service
+
+        build_dir = self.workdir / "build"
+        build_dir.mkdir(exist_ok=True)
+        # build_raw_dataset reports progress with print()
+        with working_dir(build_dir), redirect_stdout(io.StringIO()):
+            calls = nba_api_service.scheduler.stats["calls"]
+            rows = len(nba_api_service.build_raw_dataset())
+            calls = nba_api_service.scheduler.stats["calls"] - calls
+            samples = measure(nba_api_service.build_raw_dataset, self.repeat, warmup=0)
+        self.record("ingest.build", 1, summarize(samples), rows=rows, upstream_calls=calls)
+
+    def run(self):
+        from benchmarks import synthetic
+
+        for scale in self.scales:
+            csv_path = self.workdir / f"dataset-{scale}x.csv"
+            synthetic.write_dataset_csv(csv_path, n_players=synthetic.BASE_PLAYERS * scale)
+            if self.wanted("startup"):
+                self.startup(scale, csv_path)
+            if self.wanted("predict") or self.wanted("http") or self.wanted("encode"):
+                self.serving(scale, csv_path)
+            if self.wanted("ingest"):
+                self.ingest_transform(scale)
+        if self.wanted("ingest"):
+            self.ingest_build()
+
+
+def environment() -> dict:
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "inference_backend": os.getenv("INFERENCE_BACKEND", "keras").lower(),
+        "fast_json": os.getenv("FAST_JSON", "0") == "1",
+    }
+
+
+def compare(old: dict, new: dict):
+    """Print p50 changes for benches present in both result files."""
+    print(f"\n{'bench':<32} {'before':>12} {'after':>12} {'change':>8}")
+    for key in sorted(set(old["results"]) & set(new["results"])):
+        before, after = old["results"][key]["p50_ms"], new["results"][key]["p50_ms"]
+        change = (after - before) / before * 100 if before else float("nan")
+        print(f"{key:<32} {before:>10.3f}ms {after:>10.3f}ms {change:>+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the prediction, loading and ingest paths.")
+    parser.add_argument("--scales", default="1,10", help="comma-separated data multipliers (1 = 50 players)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per bench")
+    parser.add_argument("--only", help=f"comma-separated groups to run: {', '.join(GROUPS)}")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="results JSON to write")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    only = [g for g in args.only.split(",") if g] if args.only else None
+    if only and set(only) - set(GROUPS):
+        parser.error(f"unknown group(s): {', '.join(sorted(set(only) - set(GROUPS)))}")
+
+    port = _free_port()
+    _configure_env(f"http://127.0.0.1:{port}/stats")
+    # main.py loads its model artifacts relative to backend/
+    os.chdir(BACKEND_DIR)
+
+    from benchmarks.nba_stub import StubServer, create_app
+
+    stub = StubServer(create_app(), port=port).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="nba-bench-") as tmp:
+            bench = Bench(scales, args.repeat, only, Path(tmp))
+            bench.run()
+    finally:
+        stub.stop()
+
+    report = {"environment": environment(), "scales": scales, "repeat": args.repeat, "results": bench.results}
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic data for the benchmarks.
+
+Two generators, both deterministic for a given seed:
+
+* `make_dataset` builds rows in the raw CSV schema (`DATASET_COLUMNS`, dates
+  formatted like "Apr 03, 2022") for any number of players and seasons, so
+  load and prediction paths can be measured at 10×–100× today's size.
+* `make_game_log` builds a PlayerGameLog result set (same headers as
+  stats.nba.com, newest game first, occasional DNPs) for the ingest
+  transform and the nba_api stub.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.dataset_store import CSV_DATE_FORMAT
+from services.nba_api_service import DATASET_COLUMNS, SEASONS, get_team_ids_by_abbrev
+
+# The current dataset: top 50 scorers over three seasons
+BASE_PLAYERS = 50
+GAMES_PER_SEASON = 70
+# Synthetic player IDs start here (well clear of real nba_api IDs)
+FIRST_PLAYER_ID = 9_000_000
+
+GAME_LOG_HEADERS = [
+    "SEASON_ID", "Player_ID", "Game_ID", "GAME_DATE", "MATCHUP", "WL", "MIN",
+    "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+    "OREB", "DREB", "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "PLUS_MINUS",
+    "VIDEO_AVAILABLE",
+]
+
+
+def season_start(season: str) -> date:
+    """Opening night used for a season label like "2023-24"."""
+    return date(int(season[:4]), 10, 24)
+
+
+def team_abbrevs() -> List[str]:
+    return sorted(get_team_ids_by_abbrev())
+
+
+def def_ratings(season: str, seed: int = 0) -> Dict[int, float]:
+    """Team ID -> defensive rating for a season (what LeagueDashTeamStats returns)."""
+    rng = np.random.default_rng([seed, int(season[:4])])
+    ids = [get_team_ids_by_abbrev()[a] for a in team_abbrevs()]
+    return {tid: round(float(r), 1) for tid, r in zip(ids, rng.uniform(106.0, 120.0, len(ids)))}
+
+
+def _season_games(rng: np.random.Generator, season: str, n_games: int):
+    """Dates, points, minutes, FG% and matchup fields for one player-season."""
+    start = season_start(season)
+    gaps = rng.integers(1, 4, n_games)
+    dates = [start + timedelta(days=int(d)) for d in np.cumsum(gaps)]
+    scoring = rng.uniform(12.0, 32.0)
+    minutes = np.clip(rng.normal(33.0, 4.0, n_games), 10.0, 44.0).round(1)
+    pts = np.clip(rng.normal(scoring, 6.0, n_games), 0, None).round().astype(int)
+    fg_pct = np.clip(rng.normal(0.48, 0.08, n_games), 0.2, 0.8).round(3)
+    home = rng.integers(0, 2, n_games)
+    opponents = rng.integers(0, 30, n_games)
+    dnp = rng.random(n_games) < 0.05
+    return dates, pts, minutes, fg_pct, home, opponents, dnp
+
+
+def make_dataset(
+    n_players: int = BASE_PLAYERS,
+    seasons: Sequence[str] = SEASONS,
+    games_per_season: int = GAMES_PER_SEASON,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Rows in the raw CSV schema for `n_players` synthetic players."""
+    rng = np.random.default_rng(seed)
+    abbrevs = team_abbrevs()
+    team_ids = np.array([get_team_ids_by_abbrev()[a] for a in abbrevs])
+    frames = []
+    for season in seasons:
+        ratings = def_ratings(season, seed)
+        for i in range(n_players):
+            dates, pts, minutes, fg_pct, home, opponents, dnp = _season_games(rng, season, games_per_season)
+            played_before = np.concatenate(([True], ~dnp[:-1]))
+            keep = ~dnp
+            opp_ids = team_ids[opponents]
+            frames.append(pd.DataFrame({
+                "player_id": FIRST_PLAYER_ID + i,
+                "player_name": f"Player {i:05d}",
+                "season": season,
+                "game_date": [d.strftime(CSV_DATE_FORMAT) for d, k in zip(dates, keep) if k],
+                "pts": pts[keep],
+                "min": minutes[keep],
+                "fg_pct": fg_pct[keep],
+                "home": home[keep],
+                "opponent_id": opp_ids[keep],
+                "opp_def_rating": [ratings[t] for t in opp_ids[keep]],
+                "injury_flag": (~played_before[keep]).astype(int),
+            }))
+    return pd.concat(frames, ignore_index=True)[DATASET_COLUMNS]
+
+
+def write_dataset_csv(path, n_players: int = BASE_PLAYERS, seed: int = 0, **kwargs) -> int:
+    """Write a synthetic raw CSV to `path`; returns the number of rows."""
+    data = make_dataset(n_players, seed=seed, **kwargs)
+    data.to_csv(path, index=False)
+    return len(data)
+
+
+def make_game_log(
+    player_id: int,
+    season: str,
+    n_games: int = GAMES_PER_SEASON,
+    team: Optional[str] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """A PlayerGameLog frame for one player-season, newest game first."""
+    rng = np.random.default_rng([seed, player_id, int(season[:4])])
+    abbrevs = team_abbrevs()
+    team = team or abbrevs[player_id % len(abbrevs)]
+    opponents_pool = [a for a in abbrevs if a != team]
+    dates, pts, minutes, fg_pct, home, opponents, dnp = _season_games(rng, season, n_games)
+    rows = []
+    for g in range(n_games):
+        opp = opponents_pool[opponents[g] % len(opponents_pool)]
+        fga = int(rng.integers(8, 25))
+        played = not dnp[g]
+        rows.append([
+            f"2{season[:4]}", player_id, f"00{season[2:4]}{g:05d}",
+            dates[g].strftime(CSV_DATE_FORMAT),
+            f"{team} vs. {opp}" if home[g] else f"{team} @ {opp}",
+            "W" if rng.random() < 0.5 else "L",
+            int(round(minutes[g])) if played else 0,
+            int(round(fga * fg_pct[g])) if played else 0, fga if played else 0,
+            float(fg_pct[g]) if played else 0.0,
+            0, 0, 0.0, 0, 0, 0.0, 0, 0, 0, 0, 0, 0, 0, 0,
+            int(pts[g]) if played else 0,
+            int(rng.integers(-20, 21)), 1,
+        ])
+    return pd.DataFrame(rows[::-1], columns=GAME_LOG_HEADERS)
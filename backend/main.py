@@ -1,19 +1,54 @@
-from fastapi import FastAPI, Body, HTTPException
+from fastapi import FastAPI, Body, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List
+from contextlib import asynccontextmanager
+import functools
 import numpy as np
-from tensorflow.keras.models import load_model
 import joblib
 import pandas as pd
 from pathlib import Path
 import os
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
+import logging
+import threading
+import time
 from routers import nba_api_live
 from routers import games
-from nba_api.stats.endpoints import leaguestandingsv3
-
-app = FastAPI(title="NBA Points Predictor")
+from schemas import BatchPrediction, Player, Prediction, RecentGame
+from services.player_index import PlayerIndex, PartitionedPlayerIndex
+from services.preprocess import compute_rolling_features
+from services.dataset_store import read_dataset_csv, read_meta, is_fresh, load_columnar
+from services import shared_store
+from services.inference_batcher import InferenceBatcher
+from services.prediction_cache import PredictionCache, artifact_version
+from services import upstream
+from services.live_cache import LiveCache
+from services.refresher import BackgroundRefresher
+from services import features
+from services import metrics
+from services import nba_live_service
+from services import insights
+from utils import fast_json, http_cache, sse
+from utils.log import RequestContextMiddleware, configure_logging, debug_sampled, get_logger
+
+configure_logging()
+logger = get_logger("nba.api")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup hooks are defined further down; they run once the module is loaded
+    warm_prediction_cache()
+    if BACKGROUND_REFRESH:
+        refresher.start()
+    yield
+    await refresher.stop()
+    await upstream.client.aclose()
+    await insights.client.aclose()
+
+
+app = FastAPI(title="NBA Points Predictor", lifespan=lifespan)
 
 # Mount new nba_api router
 app.include_router(nba_api_live.router)
@@ -46,69 +81,155 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+# Outermost: tags every request (and its log records) with an X-Request-ID
+app.add_middleware(RequestContextMiddleware)
 
 # load artifacts for inference only
-model = load_model("models/lstm_points_model.h5", compile=False)
-scaler = joblib.load("models/minmax_scaler.pkl")
+# INFERENCE_BACKEND=numpy serves the LSTM from exported NumPy weights and
+# avoids importing TensorFlow; the default uses the Keras .h5 model.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
+MODEL_PATH = "models/lstm_points_weights.npz" if INFERENCE_BACKEND == "numpy" else "models/lstm_points_model.h5"
+SCALER_PATH = "models/minmax_scaler.pkl"
+DATA_PATH = Path(__file__).parent / "raw_nba_dataset.csv"
+COLUMNAR_DIR = Path(__file__).parent / "data" / "nba_dataset"
+
+# DATA_PARTITIONS_DIR: serve the full-league partitioned dataset
+# (python -m services.nba_api_service --league). Player buckets are loaded
+# lazily on first request instead of reading everything at startup.
+DATA_PARTITIONS_DIR = os.getenv("DATA_PARTITIONS_DIR")
+
+# SHARED_STORE_DIR: attach to the read-only store prepared by start.sh
+# (services/shared_store.py) so all workers map the same dataset pages and,
+# with the NumPy backend, the same model weights.
+SHARED_STORE_DIR = os.getenv("SHARED_STORE_DIR")
+if SHARED_STORE_DIR:
+    COLUMNAR_DIR = shared_store.dataset_dir(SHARED_STORE_DIR)
+    if INFERENCE_BACKEND == "numpy":
+        MODEL_PATH = shared_store.model_dir(SHARED_STORE_DIR)
+
+
+def load_model_artifacts():
+    """Load the model for the configured backend and the fitted scaler."""
+    if INFERENCE_BACKEND == "numpy":
+        from models.lstm_model import NumpyLSTMModel
+        loaded_model = NumpyLSTMModel.load(MODEL_PATH)
+    else:
+        from tensorflow.keras.models import load_model
+        loaded_model = load_model(MODEL_PATH, compile=False)
+    return loaded_model, joblib.load(SCALER_PATH)
+
+
+def load_dataset():
+    """Load the game-log dataset with rolling features.
+
+    Memory-maps the prebuilt columnar copy (services/dataset_store.py) when it
+    is up to date with the CSV, otherwise parses the CSV. Returns (df, players)
+    where `players` is the prebuilt catalog or None; df is empty on failure.
+    """
+    meta = read_meta(COLUMNAR_DIR)
+    if is_fresh(meta, DATA_PATH):
+        try:
+            data, meta = load_columnar(COLUMNAR_DIR)
+            return data, meta["players"]
+        except Exception as e:
+            logger.warning("Columnar dataset load failed (%s), falling back to CSV", e)
+
+    try:
+        data = read_dataset_csv(DATA_PATH)
+    except Exception:
+        return pd.DataFrame(), None
+
+    # Compute rolling-average features per player (after loading)
+    return compute_rolling_features(data), None
+
+
+model, scaler = load_model_artifacts()
+
+# Coalesce concurrent model calls into one forward pass.
+# INFERENCE_BATCH_WINDOW_MS=0 disables batching (each request calls the model).
+inference_batcher = InferenceBatcher(
+    functools.partial(model.predict, verbose=0),
+    max_batch_size=int(os.getenv("INFERENCE_MAX_BATCH", "64")),
+    max_wait_ms=float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "3")),
+)
+
+def build_player_index():
+    """Load the dataset and index it. Returns (df, player_index).
+
+    In partitioned mode df stays empty and players are materialized lazily.
+    """
+    if DATA_PARTITIONS_DIR:
+        return pd.DataFrame(), PartitionedPlayerIndex(
+            DATA_PARTITIONS_DIR, max_buckets=int(os.getenv("DATA_PARTITIONS_CACHED_BUCKETS", "16"))
+        )
+    data, players = load_dataset()
+    return data, PlayerIndex(data, players)
+
 
 # Load dataset once at startup
-DATA_PATH = Path(__file__).parent / "raw_nba_dataset.csv"
-try:
-    df = pd.read_csv(DATA_PATH, parse_dates=["game_date"]) 
-    # ensure proper datetime parsing and sorting
-    df["game_date"] = pd.to_datetime(df["game_date"], errors="coerce")
-    df = df.sort_values("game_date")
-except Exception:
-    df = pd.DataFrame()
-
-# Compute rolling-average features per player (after loading)
-def compute_rolling_features(df):
-    """Add rolling-average features per player, sorted by game_date.
-    
-    Features added:
-    - pts_rolling_5: rolling mean of pts over last 5 games
-    - pts_rolling_10: rolling mean of pts over last 10 games
-    - min_rolling_5: rolling mean of min over last 5 games
-    
-    Computed per player, no data leakage, NaNs forward-filled.
+# Per-player offset index: O(1) lookup of a player's sorted game history
+df, player_index = build_player_index()
+
+# Prediction cache keyed on player + artifact version. Artifacts are re-checked
+# at most every ARTIFACT_CHECK_INTERVAL seconds and reloaded when they change.
+prediction_cache = PredictionCache(maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "1024")))
+ARTIFACT_CHECK_INTERVAL = float(os.getenv("ARTIFACT_CHECK_INTERVAL", "30"))
+DATA_ARTIFACTS = (DATA_PATH, COLUMNAR_DIR / "meta.json") if not DATA_PARTITIONS_DIR \
+    else (Path(DATA_PARTITIONS_DIR) / "manifest.json",)
+_data_version = artifact_version(*DATA_ARTIFACTS)
+_model_version = artifact_version(MODEL_PATH, SCALER_PATH)
+_artifact_state = {"checked": time.monotonic()}
+_reload_lock = threading.Lock()
+
+# Encoded /players and recent-games responses for the current dataset version
+# (sent with an ETag; clients revalidate with If-None-Match and get a 304)
+response_cache = http_cache.ResponseCache(maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")))
+STATIC_MAX_AGE = int(os.getenv("STATIC_CACHE_MAX_AGE", "300"))
+
+
+def refresh_artifacts(force=False):
+    """Reload the dataset and/or model if their files changed on disk.
+
+    Returns the current artifact version used to key cached predictions.
     """
-    if df.empty:
-        return df
-    
-    df = df.copy()
-    rolling_features = []
-    
-    for player_id in df["player_id"].unique():
-        player_data = df[df["player_id"] == player_id].sort_values("game_date").copy()
-        player_data["pts_rolling_5"] = player_data["pts"].rolling(window=5, min_periods=1).mean()
-        player_data["pts_rolling_10"] = player_data["pts"].rolling(window=10, min_periods=1).mean()
-        player_data["min_rolling_5"] = player_data["min"].rolling(window=5, min_periods=1).mean()
-        player_data[["pts_rolling_5", "pts_rolling_10", "min_rolling_5"]] = \
-            player_data[["pts_rolling_5", "pts_rolling_10", "min_rolling_5"]].fillna(method="ffill")
-        rolling_features.append(player_data)
-    
-    df_with_rolling = pd.concat(rolling_features, ignore_index=True)
-    return df_with_rolling.sort_values("game_date").reset_index(drop=True)
-
-if not df.empty:
-    df = compute_rolling_features(df)
+    global df, player_index, model, scaler, _data_version, _model_version
+    now = time.monotonic()
+    if force or now - _artifact_state["checked"] >= ARTIFACT_CHECK_INTERVAL:
+        with _reload_lock:
+            _artifact_state["checked"] = now
+            data_version = artifact_version(*DATA_ARTIFACTS)
+            if data_version != _data_version:
+                logger.info("Dataset changed on disk, reloading %s", DATA_PATH)
+                new_df, new_index = build_player_index()
+                player_index, df = new_index, new_df
+                _data_version = data_version
+            model_version = artifact_version(MODEL_PATH, SCALER_PATH)
+            if model_version != _model_version:
+                logger.info("Model artifacts changed on disk, reloading %s", MODEL_PATH)
+                model, scaler = load_model_artifacts()
+                inference_batcher.predict_fn = functools.partial(model.predict, verbose=0)
+                _model_version = model_version
+    return f"{_data_version}-{_model_version}"
 
 SEQUENCE_LENGTH = 5
 NUM_FEATURES = 8
 
-# Standings cache (10–15 min TTL)
-standings_cache = {"ts": None, "data": None}
+# Standings cache: fresh for 15 min, then served stale for up to an hour
+# while one background refresh runs (a day if the NBA API is failing)
+standings_cache = LiveCache(ttl=15 * 60, stale_while_revalidate=3600, stale_if_error=24 * 3600)
+# Encoded standings response for the entry currently served
+standings_response = http_cache.ResponseCache(maxsize=1)
 
 
-def fetch_standings_nba_api():
-    """Fetch current season standings using nba_api library."""
+async def fetch_standings_nba_api():
+    """Fetch current season standings from the LeagueStandingsV3 endpoint."""
     try:
-        standings = leaguestandingsv3.LeagueStandingsV3(
-            league_id="00",
-            season="2025-26",
-            season_type="Regular Season"
+        frames = await upstream.client.get_data_frames(
+            "leaguestandingsv3",
+            {"LeagueID": "00", "Season": "2025-26", "SeasonType": "Regular Season", "SeasonYear": ""},
         )
-        data = standings.get_data_frames()[0]
+        data = frames[0]
         
         east, west = [], []
         for _, row in data.iterrows():
@@ -133,229 +254,104 @@ def fetch_standings_nba_api():
         
         return {"east": east, "west": west}
     except Exception as e:
-        print(f"NBA API standings error: {e}")
+        logger.warning("NBA API standings error: %s", e)
         raise
 
 
-def get_recent_avg_points(player_df, n=5):
-    """Return the average points over the last n games, or None if no games."""
-    last = player_df.tail(n)
-    if last.empty:
-        return None
-    return float(last["pts"].mean())
-
-
-def build_input_sequence(player_df, feature_cols, seq_len=5):
-    """Build a (1, seq_len, num_features) numpy array from the player's last games.
-
-    If fewer than seq_len games are available, pad at the start by repeating the
-    oldest available game so the sequence length matches seq_len.
-    Returns None if there are no games.
-    """
-    last = player_df[feature_cols].tail(seq_len).values
-    if last.shape[0] == 0:
-        return None
-    if last.shape[0] < seq_len:
-        pad_count = seq_len - last.shape[0]
-        pad = np.repeat(last[0:1, :], pad_count, axis=0)
-        seq = np.vstack([pad, last])
-    else:
-        seq = last
-    return seq.reshape(1, seq_len, len(feature_cols))
-
-@app.get("/")
-def root():
-    return {"status": "NBA prediction backend running"}
-
+ENGINEERED_FEATURE_COLS = ["avg_pts_5", "avg_min_5", "pts_trend", "home_next", "opp_def", "pts_rolling_5", "pts_rolling_10"]
+RAW_SEQUENCE_COLS = ["pts", "min", "fg_pct", "home", "opp_def_rating", "injury_flag"]
 
-@app.get("/players")
-def get_players():
-    """Return a static list of players (id + name) derived from the dataset.
+# Blend weights for model prediction vs. recent form
+MODEL_WEIGHT = 0.6
+RECENT_WEIGHT = 0.4
 
-    If the dataset failed to load, return an empty list.
-    """
-    if df.empty:
-        return []
-    players = df[["player_id", "player_name"]].drop_duplicates()
-    return players.to_dict(orient="records")
+# TEAM METADATA: small static mapping (expand as needed)
+TEAM_METADATA = {
+    203507: {"team_name": "Milwaukee Bucks", "city": "Milwaukee", "conference": "East", "abbreviation": "MIL", "colors": ["#00471B", "#EEE1C6"], "logo_url": "https://cdn.nba.com/logos/nba/1610612749/primary/L/logo.svg"},
+    2544: {"team_name": "Los Angeles Lakers", "city": "Los Angeles", "conference": "West", "abbreviation": "LAL", "colors": ["#552583", "#FDB927"], "logo_url": "https://cdn.nba.com/logos/nba/1610612747/primary/L/logo.svg"},
+}
 
 
-@app.get("/standings")
-def get_standings():
-    """Return cached NBA standings (East/West) fetched from balldontlie.io.
-
-    Uses a 15-minute TTL cache to reduce repeated upstream calls.
-    """
-    now = datetime.utcnow()
-    ttl = timedelta(minutes=15)
-    if standings_cache["ts"] and standings_cache["data"] and now - standings_cache["ts"] < ttl:
-        return {
-            "last_updated": standings_cache["ts"].isoformat() + "Z",
-            **standings_cache["data"],
-        }
-
-    # Fetch using nba_api
-    try:
-        data = fetch_standings_nba_api()
-    except Exception as e:
-        print(f"NBA API standings failed: {e}")
-        raise HTTPException(status_code=502, detail="Failed to fetch standings from NBA API")
+_scaler_fallback_warned = threading.Event()
 
-    standings_cache["ts"] = now
-    standings_cache["data"] = data
-    return {
-        "last_updated": now.isoformat() + "Z",
-        **data,
-    }
 
+def predict_model_points(last_n, feat_df):
+    """Run one scaler transform and one model forward pass for a batch of players.
 
-@app.get("/player/{player_id}/recent-games")
-def recent_games(player_id: int):
-    """Return the last 5 games for `player_id` as a list of lists with features
-    in order: [pts, min, fg_pct, home, opp_def_rating, injury_flag]
+    `last_n` holds each player's last SEQUENCE_LENGTH games as stacked
+    (players, games) arrays (see PlayerIndex.stacked) and `feat_df` one row
+    of ENGINEERED_FEATURE_COLS per player, in the same order. Returns the
+    inverse-scaled model prediction (points) for each player, in order.
     """
-    if df.empty:
-        raise HTTPException(status_code=500, detail="Dataset not loaded")
-
-    player_df = df[df["player_id"] == player_id].sort_values("game_date")
-    if player_df.empty:
-        raise HTTPException(status_code=404, detail="Player not found")
-
-    last5 = player_df.tail(5)
-    if len(last5) < 5:
-        raise HTTPException(status_code=400, detail="Player has fewer than 5 games")
-
-    # Build list of dicts with required fields for frontend charts.
-    out = []
-    for _, row in last5.iterrows():
-        out.append(
-            {
-                "game_date": row["game_date"].strftime("%Y-%m-%d") if not pd.isna(row["game_date"]) else None,
-                "pts": int(row["pts"]) if not pd.isna(row["pts"]) else None,
-                "min": float(row["min"]) if not pd.isna(row["min"]) else None,
-                "fg_pct": float(row["fg_pct"]) if not pd.isna(row["fg_pct"]) else None,
-            }
-        )
-
-    return out
-
-
-@app.post("/predict/player/{player_id}")
-def predict_player(player_id: int):
-    """Predict next-game points for a player using their last 5 games.
-
-    - No request body required (frontend should only send `player_id`).
-    - Uses the same MinMaxScaler (do NOT refit) applied to the exact 6 features.
-    - Inverse-scales only the predicted `pts` value.
-    """
-    if df.empty:
-        raise HTTPException(status_code=500, detail="Dataset not loaded")
-
-    player_df = df[df["player_id"] == player_id].sort_values("game_date")
-    if player_df.empty:
-        raise HTTPException(status_code=404, detail="Player not found")
-
-    # Compute recent average points (uses up to last SEQUENCE_LENGTH games)
-    # Compute recent average points (uses up to last SEQUENCE_LENGTH games)
-    recent_avg = get_recent_avg_points(player_df, SEQUENCE_LENGTH)
-
-    # Use last up to SEQUENCE_LENGTH games to compute engineered features
-    last_n = player_df.tail(SEQUENCE_LENGTH)
-    n_games = len(last_n)
-    if n_games == 0:
-        raise HTTPException(status_code=400, detail="Player has no game data")
-
-    # Feature engineering
-    avg_pts_5 = float(last_n["pts"].mean())
-    avg_min_5 = float(last_n["min"].mean())
-    # pts_trend: (last - first) / number_of_games
-    pts_first = float(last_n["pts"].iloc[0])
-    pts_last = float(last_n["pts"].iloc[-1])
-    pts_trend = (pts_last - pts_first) / float(n_games)
-    # home_next: use last game's home flag as a proxy
-    home_next = int(last_n["home"].iloc[-1]) if not pd.isna(last_n["home"].iloc[-1]) else 0
-    # opponent defensive rating: use last game's opp_def_rating
-    opp_def = float(last_n["opp_def_rating"].iloc[-1]) if not pd.isna(last_n["opp_def_rating"].iloc[-1]) else 0.0
-    # rolling features from dataset (with safe fallback to avg_pts_5)
-    pts_rolling_5 = float(last_n["pts_rolling_5"].iloc[-1]) if "pts_rolling_5" in last_n.columns and not pd.isna(last_n["pts_rolling_5"].iloc[-1]) else avg_pts_5
-    pts_rolling_10 = float(last_n["pts_rolling_10"].iloc[-1]) if "pts_rolling_10" in last_n.columns and not pd.isna(last_n["pts_rolling_10"].iloc[-1]) else avg_pts_5
-
-    engineered = {
-        "avg_pts_5": avg_pts_5,
-        "avg_min_5": avg_min_5,
-        "pts_trend": pts_trend,
-        "home_next": home_next,
-        "opp_def": opp_def,
-        "pts_rolling_5": pts_rolling_5,
-        "pts_rolling_10": pts_rolling_10,
-    }
-
-    # Log engineered features before scaling
-    print("ENGINEERED FEATURES:", engineered)
-
-    # Build DataFrame for scaler transform to preserve column order/names
-    feat_df = pd.DataFrame([engineered], columns=["avg_pts_5", "avg_min_5", "pts_trend", "home_next", "opp_def", "pts_rolling_5", "pts_rolling_10"])
-
     use_fallback_raw_sequence = False
     try:
-        X_scaled = scaler.transform(feat_df)
-        # Log scaled features before prediction
-        print("SCALED FEATURES:", X_scaled.tolist())
-
-        # Reshape to (1, timesteps, features). We use 1 timestep and len(features) features.
-        X_input = np.array(X_scaled).reshape(1, 1, X_scaled.shape[1])
+        with metrics.stage("scaler_transform"):
+            X_scaled = scaler.transform(feat_df)
+        # Log scaled features before prediction (sampled, DEBUG only)
+        if debug_sampled(logger):
+            logger.debug("Scaled features", extra={"data": X_scaled.tolist()})
+
+        # Reshape to (batch, timesteps, features). We use 1 timestep and len(features) features.
+        X_input = np.array(X_scaled).reshape(len(feat_df), 1, X_scaled.shape[1])
     except Exception as e:
         # Scaler transform failed (feature mismatch). Fall back to the previous
         # raw-sequence input (last 5 per-game features) to avoid 500 error.
-        print(f"WARNING: scaler.transform failed: {e}. Falling back to raw sequence input.")
+        # This repeats on every call while the scaler doesn't match, so only
+        # the first occurrence is a warning
+        logger.log(
+            logging.DEBUG if _scaler_fallback_warned.is_set() else logging.WARNING,
+            "scaler.transform failed: %s. Falling back to raw sequence input.", e,
+        )
+        _scaler_fallback_warned.set()
         use_fallback_raw_sequence = True
 
     try:
         if use_fallback_raw_sequence:
-            # Build original raw per-game sequence (5 timesteps x 6 features)
-            orig_cols = ["pts", "min", "fg_pct", "home", "opp_def_rating", "injury_flag"]
-            X_seq = build_input_sequence(player_df, orig_cols, seq_len=SEQUENCE_LENGTH)
-            if X_seq is None:
-                raise HTTPException(status_code=400, detail="Player has no game data for fallback input")
-            y_scaled = model.predict(X_seq)[0][0]
-        else:
-            y_scaled = model.predict(X_input)[0][0]
+            # Original raw per-game sequences (batch x 5 timesteps x 6 features);
+            # players with fewer games repeat their first one at the start
+            X_input = np.stack([last_n[col] for col in RAW_SEQUENCE_COLS], axis=-1)
+        with metrics.stage("model_predict"):
+            y_scaled = inference_batcher.predict(X_input)[:, 0]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
 
     # Inverse-scale only the predicted points (assumes pts was the first feature used in the scaler during training)
     pts_min = scaler.data_min_[0]
     pts_max = scaler.data_max_[0]
-    model_prediction = float(y_scaled * (pts_max - pts_min) + pts_min)
+    return [float(y * (pts_max - pts_min) + pts_min) for y in y_scaled]
+
+
+def build_prediction_payload(player_id, window, engineered, model_prediction):
+    """Blend the model prediction with recent form and build the response dict.
+
+    `window` holds the player's last features.HISTORY_GAMES games as arrays.
+    """
+    last_n = features.tail(window, SEQUENCE_LENGTH)
+    avg_pts_5 = engineered["avg_pts_5"]
+    avg_min_5 = engineered["avg_min_5"]
+    pts_trend = engineered["pts_trend"]
+    opp_def = engineered["opp_def"]
+
+    # Compute recent average points (uses up to last SEQUENCE_LENGTH games)
+    recent_avg = features.nanmean(last_n["pts"]) if len(last_n["pts"]) else None
 
     # Blend model prediction with recent form
-    MODEL_WEIGHT = 0.6
-    RECENT_WEIGHT = 0.4
     if recent_avg is None:
         final_prediction = model_prediction
     else:
         final_prediction = MODEL_WEIGHT * model_prediction + RECENT_WEIGHT * float(recent_avg)
 
-    # Log final predicted points
-    print(f"FINAL PREDICTED POINTS: {final_prediction}")
+    # Log final predicted points (sampled, DEBUG only)
+    if debug_sampled(logger):
+        logger.debug("Final predicted points", extra={"data": {"player_id": player_id, "points": final_prediction}})
 
     # Build recent_games array for response (date, pts, min, fg_pct)
-    recent_games = []
-    for _, row in last_n.iterrows():
-        recent_games.append(
-            {
-                "date": row["game_date"].strftime("%Y-%m-%d") if not pd.isna(row["game_date"]) else None,
-                "pts": int(row["pts"]) if not pd.isna(row["pts"]) else None,
-                "min": float(row["min"]) if not pd.isna(row["min"]) else None,
-                "fg_pct": float(row["fg_pct"]) if not pd.isna(row["fg_pct"]) else None,
-            }
-        )
+    recent_games = features.game_records(last_n)
 
     # CONFIDENCE BAND: compute recent pts std and derive band + label
-    try:
-        pts_std = float(last_n["pts"].std(ddof=0)) if not last_n["pts"].isna().all() else 0.0
-    except Exception:
-        pts_std = 0.0
+    pts_std = features.spread(last_n["pts"])
     confidence_band = round(float(pts_std * 1.5), 2)  # multiplier to widen the band slightly
     # label relative to recent average
     try:
@@ -370,10 +366,7 @@ def predict_player(player_id: int):
         conf_label = "Large"
 
     # MINUTES STABILITY
-    try:
-        min_std = float(last_n["min"].std(ddof=0)) if not last_n["min"].isna().all() else 0.0
-    except Exception:
-        min_std = 0.0
+    min_std = features.spread(last_n["min"])
     minutes_stability = "Stable" if min_std < 5.0 else "Volatile"
 
     # SCORING TREND LABEL
@@ -385,7 +378,7 @@ def predict_player(player_id: int):
         trend_label = "Flat"
 
     # OPPONENT DEFENSE CONTEXT
-    league_opp_def = df["opp_def_rating"].mean() if ("opp_def_rating" in df.columns and not df["opp_def_rating"].isna().all()) else None
+    league_opp_def = player_index.league_opp_def_mean
     opp_phrase = ""
     if league_opp_def is not None:
         if opp_def > league_opp_def + 1.5:
@@ -418,28 +411,8 @@ def predict_player(player_id: int):
     }
 
     # AVERAGE ERROR (approx) over last 10 games using a simple baseline: previous-5-game mean
-    errors = []
-    try:
-        total_games = len(player_df)
-        num_considered = min(10, total_games)
-        for k in range(1, num_considered + 1):
-            idx = total_games - k
-            # preceding 5 games end at idx-1, start at idx-5
-            start = max(0, idx - 5)
-            end = idx
-            if end - start >= 5:
-                baseline = float(player_df.iloc[start:end]["pts"].mean())
-                actual = float(player_df.iloc[idx]["pts"])
-                errors.append(abs(baseline - actual))
-    except Exception:
-        errors = []
-    avg_error_last_10 = round(float(sum(errors) / len(errors)), 2) if errors else None
+    avg_error_last_10 = features.avg_error_last_10(window["pts"])
 
-    # TEAM METADATA: small static mapping (expand as needed)
-    TEAM_METADATA = {
-        203507: {"team_name": "Milwaukee Bucks", "city": "Milwaukee", "conference": "East", "abbreviation": "MIL", "colors": ["#00471B", "#EEE1C6"], "logo_url": "https://cdn.nba.com/logos/nba/1610612749/primary/L/logo.svg"},
-        2544: {"team_name": "Los Angeles Lakers", "city": "Los Angeles", "conference": "West", "abbreviation": "LAL", "colors": ["#552583", "#FDB927"], "logo_url": "https://cdn.nba.com/logos/nba/1610612747/primary/L/logo.svg"},
-    }
     team_info = TEAM_METADATA.get(player_id, {"team_name": None, "city": None, "conference": None, "abbreviation": None, "colors": None, "logo_url": None})
 
     # Build final response with new fields
@@ -466,8 +439,297 @@ def predict_player(player_id: int):
     }
 
 
+@app.get("/")
+def root():
+    return {"status": "NBA prediction backend running"}
+
+
+@app.get("/players", response_model=List[Player])
+def get_players(request: Request):
+    """Return a static list of players (id + name) derived from the dataset.
+
+    If the dataset failed to load, return an empty list. The list is encoded
+    once per dataset version and revalidated through its ETag.
+    """
+    refresh_artifacts()
+    index = player_index
+    encoded = response_cache.get("players", _data_version, lambda: index.players if len(index) else [])
+    return http_cache.respond(request, encoded, f"public, max-age={STATIC_MAX_AGE}")
+
+
+@app.get("/standings")
+async def get_standings(request: Request):
+    """Return cached NBA standings (East/West) fetched from balldontlie.io.
+
+    Uses a 15-minute TTL cache to reduce repeated upstream calls. Concurrent
+    misses share one upstream fetch, and the previous standings are served
+    while they refresh or if the NBA API is failing. Browsers may reuse the
+    response until the entry goes stale and revalidate it through its ETag.
+    """
+    try:
+        entry = await standings_cache.get("standings", fetch_standings_nba_api)
+    except Exception as e:
+        logger.warning("NBA API standings failed: %s", e)
+        raise HTTPException(status_code=502, detail="Failed to fetch standings from NBA API")
+
+    encoded = standings_response.get("standings", repr(entry.fetched_at), lambda: {
+        "last_updated": datetime.utcfromtimestamp(entry.fetched_at).isoformat() + "Z",
+        **entry.value,
+    })
+    max_age = max(0, int(standings_cache.ttl - entry.age))
+    return http_cache.respond(request, encoded, f"public, max-age={max_age}")
+
+
+async def refresh_standings():
+    await standings_cache.refresh("standings", fetch_standings_nba_api)
+
+
+# BACKGROUND_REFRESH=1 keeps the scoreboard and standings caches warm from
+# background tasks so no user request waits on the NBA API: the scoreboard
+# every 30s while games are on (4 min otherwise), standings every 10 min.
+BACKGROUND_REFRESH = os.getenv("BACKGROUND_REFRESH", "0") == "1"
+STANDINGS_REFRESH_SECONDS = 10 * 60
+refresher = BackgroundRefresher()
+refresher.add("scoreboard", games.refresh_games, games.refresh_interval)
+refresher.add("standings", refresh_standings, STANDINGS_REFRESH_SECONDS)
+
+
+metrics.add_cache_collector("scoreboard", games.cache_stats)
+metrics.add_cache_collector("standings", standings_cache.get_stats)
+metrics.add_cache_collector("season_stats", nba_live_service.cache_stats)
+metrics.add_cache_collector("insights", insights.cache_stats)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of request, stage, upstream and cache metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/refresh/status")
+def refresh_status():
+    """Return last-refresh timestamps and errors for the background refresher."""
+    return {"enabled": BACKGROUND_REFRESH, "running": refresher.running, "jobs": refresher.status()}
+
+
+@app.get("/player/{player_id}/recent-games", response_model=List[RecentGame])
+def recent_games(player_id: int, request: Request):
+    """Return the last 5 games for `player_id` as a list of lists with features
+    in order: [pts, min, fg_pct, home, opp_def_rating, injury_flag]
+
+    Encoded once per player and dataset version and revalidated through its ETag.
+    """
+    if len(player_index) == 0:
+        raise HTTPException(status_code=500, detail="Dataset not loaded")
+
+    refresh_artifacts()
+    encoded = response_cache.get(("recent_games", player_id), _data_version, lambda: recent_game_records(player_id))
+    return http_cache.respond(request, encoded, f"public, max-age={STATIC_MAX_AGE}")
+
+
+def recent_game_records(player_id):
+    last5 = player_index.arrays(player_id, ("game_date", "pts", "min", "fg_pct"), last_n=5)
+    if last5 is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    if len(last5["pts"]) < 5:
+        raise HTTPException(status_code=400, detail="Player has fewer than 5 games")
+
+    # Build list of dicts with required fields for frontend charts.
+    return features.game_records(last5, date_key="game_date")
+
+
+def predict_players(player_ids):
+    """Return {player_id: payload} for the known players in `player_ids`.
+
+    Cached predictions are served directly; the remaining players share one
+    scaler transform and one model forward pass.
+    """
+    with metrics.maybe_profile("predict"):
+        return _predict_players(player_ids)
+
+
+def _predict_players(player_ids):
+    version = refresh_artifacts()
+    results, misses = cached_predictions(player_ids, version)
+    if misses:
+        results.update(compute_predictions(misses, version))
+    return results
+
+
+def cached_predictions(player_ids, version):
+    """Split `player_ids` into ({player_id: cached payload}, [known players still to predict])."""
+    results, misses = {}, []
+    for player_id in player_ids:
+        cached = prediction_cache.get(player_id, version)
+        if cached is not None:
+            results[player_id] = cached
+        elif player_id in player_index:
+            misses.append(player_id)
+    metrics.cache_requests.inc(len(results), cache="prediction", result="hit")
+    metrics.cache_requests.inc(len(misses), cache="prediction", result="miss")
+    return results, misses
+
+
+def compute_predictions(player_ids, version):
+    """Predict known, uncached players with one model pass and cache the payloads.
+
+    All players' windows are gathered into stacked arrays in one step and the
+    engineered features computed over the whole batch; only the response
+    payloads are built player by player.
+    """
+    # Last HISTORY_GAMES games: enough for the error baseline; the model
+    # input and engineered features use the last SEQUENCE_LENGTH of them
+    with metrics.stage("load_window"):
+        stacked, lengths = player_index.stacked(player_ids, features.WINDOW_COLUMNS, last_n=features.HISTORY_GAMES)
+    if (lengths == 0).any():
+        raise HTTPException(status_code=400, detail="Player has no game data")
+    with metrics.stage("features"):
+        last_n = features.tail(stacked, SEQUENCE_LENGTH)
+        feat_df = pd.DataFrame(
+            features.engineer_features_batch(last_n, np.minimum(lengths, SEQUENCE_LENGTH)),
+            columns=ENGINEERED_FEATURE_COLS,
+        )
+    engineered_rows = feat_df.to_dict(orient="records")
+    # Log engineered features before scaling (sampled, DEBUG only)
+    if debug_sampled(logger):
+        logger.debug("Engineered features", extra={"data": [
+            {"player_id": player_id, **engineered} for player_id, engineered in zip(player_ids, engineered_rows)
+        ]})
+
+    results = {}
+    model_predictions = predict_model_points(last_n, feat_df)
+    for i, (player_id, engineered, model_prediction) in enumerate(zip(player_ids, engineered_rows, model_predictions)):
+        window = {name: values[i, -lengths[i]:] for name, values in stacked.items()}
+        with metrics.stage("response_build"):
+            payload = build_prediction_payload(player_id, window, engineered, model_prediction)
+        prediction_cache.put(player_id, version, payload)
+        results[player_id] = payload
+    return results
+
+
+def warm_prediction_cache():
+    """Optionally precompute predictions for every player (PREDICTION_CACHE_WARM=1)."""
+    if os.getenv("PREDICTION_CACHE_WARM", "0") != "1" or len(player_index) == 0:
+        return
+    predictions = predict_players([p["player_id"] for p in player_index.players])
+    logger.info("Prediction cache warmed for %d players", len(predictions))
+
+
+@app.post("/predict/player/{player_id}", response_model=Prediction)
+def predict_player(player_id: int):
+    """Predict next-game points for a player using their last 5 games.
+
+    - No request body required (frontend should only send `player_id`).
+    - Uses the same MinMaxScaler (do NOT refit) applied to the exact 6 features.
+    - Inverse-scales only the predicted `pts` value.
+    - Served from the prediction cache when the artifacts are unchanged.
+    """
+    if len(player_index) == 0:
+        raise HTTPException(status_code=500, detail="Dataset not loaded")
+
+    if player_id not in player_index:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    return fast_json.respond(predict_players([player_id])[player_id])
+
+
+@app.post("/predict/batch", response_model=BatchPrediction)
+def predict_batch(payload: dict = Body({})):
+    """Predict next-game points for many players with a single model call.
+
+    Expects JSON payload with key:
+      - player_ids (list of ints, or "all" for every player in the dataset)
+
+    Returns: {"predictions": [<predict_player payload>, ...], "not_found": [ids]}
+    """
+    if len(player_index) == 0:
+        raise HTTPException(status_code=500, detail="Dataset not loaded")
+
+    player_ids = requested_player_ids(payload)
+    results = predict_players(player_ids)
+    return fast_json.respond({
+        "predictions": [results[pid] for pid in player_ids if pid in results],
+        "not_found": [pid for pid in player_ids if pid not in results],
+    })
+
+
+def requested_player_ids(payload):
+    """Validated, de-duplicated player IDs from a batch request body (order kept)."""
+    requested = payload.get("player_ids")
+    if requested is None:
+        requested = payload.get("playerIds")
+    if requested is None:
+        requested = []
+    if requested == "all":
+        requested = [p["player_id"] for p in player_index.players]
+    if not isinstance(requested, list):
+        raise HTTPException(status_code=422, detail="player_ids must be a list or \"all\"")
+
+    player_ids, seen = [], set()
+    for raw_id in requested:
+        # Integers or decimal-digit strings only: int() would also truncate
+        # floats (1.7 -> 1) and turn booleans into 0/1
+        if isinstance(raw_id, int) and not isinstance(raw_id, bool):
+            player_id = raw_id
+        elif isinstance(raw_id, str) and raw_id.isascii() and raw_id.isdigit():
+            player_id = int(raw_id)
+        else:
+            raise HTTPException(status_code=422, detail=f"Invalid player id: {raw_id!r}")
+        if player_id not in seen:
+            seen.add(player_id)
+            player_ids.append(player_id)
+    return player_ids
+
+
+# Players per model pass when streaming batch predictions: smaller chunks
+# mean earlier first results, larger ones fewer forward passes
+PREDICT_STREAM_CHUNK = int(os.getenv("PREDICT_STREAM_CHUNK", "8"))
+
+
+@app.post("/predict/batch/stream")
+def predict_batch_stream(payload: dict = Body({})):
+    """Stream batch predictions as server-sent events, one per player.
+
+    Same body as /predict/batch. Cached predictions are sent immediately; the
+    rest follow as each chunk of PREDICT_STREAM_CHUNK players is predicted.
+
+    Events:
+      - prediction: a /predict/player payload
+      - error: {"player_ids": [...], "detail": str} for a chunk that failed
+      - done: {"count": <predictions sent>, "not_found": [ids]}
+    """
+    if len(player_index) == 0:
+        raise HTTPException(status_code=500, detail="Dataset not loaded")
+
+    player_ids = requested_player_ids(payload)
+
+    def events():
+        version = refresh_artifacts()
+        cached, misses = cached_predictions(player_ids, version)
+        # Chunk players bucket by bucket (partitioned dataset) so each loads once
+        misses = player_index.grouped(misses)
+        for prediction in cached.values():
+            yield sse.event("prediction", prediction)
+        sent = len(cached)
+        for start in range(0, len(misses), PREDICT_STREAM_CHUNK):
+            chunk = misses[start:start + PREDICT_STREAM_CHUNK]
+            try:
+                results = compute_predictions(chunk, version)
+            except HTTPException as e:
+                yield sse.event("error", {"player_ids": chunk, "detail": e.detail})
+                continue
+            for player_id in chunk:
+                yield sse.event("prediction", results[player_id])
+            sent += len(chunk)
+        found = set(cached) | set(misses)
+        yield sse.event("done", {"count": sent, "not_found": [pid for pid in player_ids if pid not in found]})
+
+    return StreamingResponse(events(), media_type=sse.MEDIA_TYPE, headers=sse.HEADERS)
+
+
 @app.post("/insights/player/{player_id}")
-def player_insights(player_id: int, payload: dict = Body({})):
+async def player_insights(player_id: int, payload: dict = Body({})):
     """Generate concise bullet-point insights using Gemini (if available).
 
     Expects JSON payload with keys:
@@ -475,119 +737,92 @@ def player_insights(player_id: int, payload: dict = Body({})):
       - recent_games (list of {date, pts, min, fg_pct})
 
     Returns: {"insights": [str, ...]}
+
+    Identical requests are served from the insights cache and concurrent
+    ones share a single Gemini call (services/insights.py).
     """
     # Basic validation
     predicted_points = payload.get("predicted_points")
     recent_games = payload.get("recent_games") or payload.get("recentGames") or []
+    prompt = insights.build_prompt(player_id, predicted_points, recent_games)
 
-    # Build a short prompt for Gemini
-    prompt_lines = [
-        f"Player ID: {player_id}",
-        f"Predicted points: {predicted_points}",
-        "Recent games:",
-    ]
-    for g in recent_games:
-        date = g.get("date") or g.get("game_date")
-        pts = g.get("pts")
-        mins = g.get("min")
-        fg = g.get("fg_pct")
-        prompt_lines.append(f"{date}: {pts} pts, {mins} min, FG% {fg}")
-
-    prompt_lines.append(
-        "Summarize the player's recent performance and expected next game in 4 short bullet points. Focus on form, consistency, minutes, and scoring trend."
-    )
+    # If no API key, return fallback insights
+    api_key = insights.api_key()
+    if not api_key:
+        return {"insights": NO_KEY_FALLBACK}
 
-    prompt = "\n".join(prompt_lines)
+    try:
+        return {"insights": await insights.generate_insights(prompt, api_key)}
+    except Exception as e:
+        return {"insights": insights_fallback(e)}
 
-    api_key = os.environ.get("GEMINI_API_KEY")
-    api_url = os.environ.get("GEMINI_API_URL") or "https://api.generative.googleapis.com/v1/models/gemini-1.0:generate"
 
-    # If no API key, return fallback insights
-    if not api_key:
-        fallback = [
-            "AI insights not available (no API key).",
-            "Use recent game averages and trends for quick checks.",
-        ]
-        return {"insights": fallback}
+NO_KEY_FALLBACK = [
+    "AI insights not available (no API key).",
+    "Use recent game averages and trends for quick checks.",
+]
 
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    body = {
-        "prompt": prompt,
-        "maxOutputTokens": 256,
-        "temperature": 0.2,
-    }
 
-    # Determine TLS verification behavior. Prefer an explicit GEMINI_CA_BUNDLE
-    # or REQUESTS_CA_BUNDLE (path to PEM file) for corporate proxies or custom CAs.
-    ca_bundle = os.environ.get("GEMINI_CA_BUNDLE") or os.environ.get("REQUESTS_CA_BUNDLE")
-    verify_param = ca_bundle if ca_bundle else True
+@app.post("/insights/player/{player_id}/stream")
+async def player_insights_stream(player_id: int, payload: dict = Body({})):
+    """Stream insights bullet by bullet as server-sent events.
 
-    try:
-        print(f"Calling Gemini API at: {api_url} (verify={verify_param})")
-        resp = requests.post(api_url, headers=headers, json=body, timeout=10, verify=verify_param)
-        resp.raise_for_status()
-        data = resp.json()
-        # Try several possible response shapes
-        text = None
-        if isinstance(data, dict):
-            # models may return candidates or outputs depending on API version
-            if "candidates" in data and data["candidates"]:
-                text = data["candidates"][0].get("content") or data["candidates"][0].get("output")
-            elif "output" in data and isinstance(data["output"], list) and data["output"]:
-                # some responses nest text under output[0].content[0].text
-                o0 = data["output"][0]
-                if isinstance(o0, dict):
-                    # find text fields
-                    if "content" in o0 and isinstance(o0["content"], list) and o0["content"]:
-                        # join text entries
-                        parts = []
-                        for c in o0["content"]:
-                            if isinstance(c, dict):
-                                if "text" in c:
-                                    parts.append(c["text"])
-                                elif "text" in c.get("span", {}):
-                                    parts.append(c["span"]["text"])
-                        text = "\n".join(parts)
-        if not text:
-            # fallback: try to stringify response
-            text = data.get("text") if isinstance(data, dict) else None
-
-        if not text:
-            raise ValueError("No text returned from Gemini")
-
-        # Split into bullet points by newlines and return up to 6 bullets
-        bullets = [line.strip(" -•\t") for line in text.splitlines() if line.strip()]
-        if len(bullets) == 0:
-            bullets = [text]
-        return {"insights": bullets[:6]}
-    except requests.exceptions.SSLError as ssl_err:
-        print(f"Gemini SSL error: {ssl_err}")
-        # Provide actionable guidance: prefer configuring a CA bundle.
-        if ca_bundle:
-            msg = (
-                "SSL verification failed even when using GEMINI_CA_BUNDLE/REQUESTS_CA_BUNDLE. "
-                "Check that the PEM file contains the correct CA and is readable by the process."
-            )
-            print(msg)
-            fallback = [
-                "AI insights unavailable due to SSL verification error.",
-                "Check GEMINI_CA_BUNDLE/REQUESTS_CA_BUNDLE points to a valid PEM with the proxy CA.",
-            ]
-            return {"insights": fallback}
-        # If no CA bundle provided, suggest the secure fix
-        print("SSL verification failed. Suggest setting GEMINI_CA_BUNDLE or installing the corporate CA into the system trust store.")
-        fallback = [
-            "AI insights unavailable due to SSL verification error.",
-            "Set GEMINI_CA_BUNDLE (path to PEM) or add your proxy CA to the OS trust store for a permanent fix.",
-        ]
-        return {"insights": fallback}
-    except Exception as e:
-        print(f"Gemini call failed: {e}")
-        fallback = [
+    Same body as /insights/player/{player_id}. With GEMINI_STREAM_URL set,
+    each bullet is sent as soon as Gemini has produced it; cached insights
+    are sent at once.
+
+    Events:
+      - insight: {"text": str}
+      - error: {"insights": [fallback bullets]} if generation failed
+      - done: {}
+    """
+    predicted_points = payload.get("predicted_points")
+    recent_games = payload.get("recent_games") or payload.get("recentGames") or []
+    prompt = insights.build_prompt(player_id, predicted_points, recent_games)
+    api_key = insights.api_key()
+
+    async def events():
+        if not api_key:
+            for bullet in NO_KEY_FALLBACK:
+                yield sse.event("insight", {"text": bullet})
+        else:
+            try:
+                async for bullet in insights.stream_insights(prompt, api_key):
+                    yield sse.event("insight", {"text": bullet})
+            except Exception as e:
+                yield sse.event("error", {"insights": insights_fallback(e)})
+        yield sse.event("done", {})
+
+    return StreamingResponse(events(), media_type=sse.MEDIA_TYPE, headers=sse.HEADERS)
+
+
+def insights_fallback(e):
+    """Fallback bullets (and log guidance) when generating insights failed."""
+    if not insights.is_ssl_error(e):
+        logger.warning("Gemini call failed: %s", e)
+        return [
             "AI insights temporarily unavailable.",
             "Fallback: look at recent average points and minutes for quick context.",
         ]
-        return {"insights": fallback}
+
+    logger.warning("Gemini SSL error: %s", e)
+    # Provide actionable guidance: prefer configuring a CA bundle.
+    if insights.GEMINI_CA_BUNDLE:
+        msg = (
+            "SSL verification failed even when using GEMINI_CA_BUNDLE/REQUESTS_CA_BUNDLE. "
+            "Check that the PEM file contains the correct CA and is readable by the process."
+        )
+        logger.warning(msg)
+        return [
+            "AI insights unavailable due to SSL verification error.",
+            "Check GEMINI_CA_BUNDLE/REQUESTS_CA_BUNDLE points to a valid PEM with the proxy CA.",
+        ]
+    # If no CA bundle provided, suggest the secure fix
+    logger.warning("SSL verification failed. Suggest setting GEMINI_CA_BUNDLE or installing the corporate CA into the system trust store.")
+    return [
+        "AI insights unavailable due to SSL verification error.",
+        "Set GEMINI_CA_BUNDLE (path to PEM) or add your proxy CA to the OS trust store for a permanent fix.",
+    ]
 
 # End of file
 
@@ -0,0 +1,237 @@
+"""Pure-NumPy inference for the points LSTM.
+
+Loading the Keras model pulls in all of TensorFlow for a network with three
+small weight layers. This module runs the same forward pass (stacked LSTMs +
+Dense, Dropout is a no-op at inference) in NumPy from a compact .npz weight
+file, so workers can serve predictions without importing TensorFlow.
+
+Export the weights from the .h5 (needs h5py, no TensorFlow) with --export,
+and check the weight file against Keras (needs TensorFlow) on sequences from
+the dataset with --check:
+
+    python -m models.lstm_model --export --check
+"""
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+MODELS_DIR = Path(__file__).parent
+H5_PATH = MODELS_DIR / "lstm_points_model.h5"
+WEIGHTS_PATH = MODELS_DIR / "lstm_points_weights.npz"
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 0.5 * (np.tanh(0.5 * x) + 1.0),
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+def _activation(name):
+    try:
+        return _ACTIVATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported activation: {name}")
+
+
+class NumpyLSTMModel:
+    """Sequential LSTM/Dense stack with a Keras-compatible `predict`."""
+
+    def __init__(self, layers: List[dict], weights: dict):
+        self.layers = layers
+        self.weights = {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+
+    @classmethod
+    def load(cls, path=WEIGHTS_PATH):
+        """Load weights written by `export_weights` (.npz) or `save_dir` (directory)."""
+        if Path(path).is_dir():
+            return cls.load_dir(path)
+        with np.load(path, allow_pickle=False) as data:
+            layers = json.loads(str(data["__layers__"]))
+            weights = {k: data[k] for k in data.files if k != "__layers__"}
+        return cls(layers, weights)
+
+    @classmethod
+    def load_dir(cls, path, mmap=True):
+        """Load weights saved with `save_dir`, memory-mapped read-only by default."""
+        path = Path(path)
+        manifest = json.loads((path / "layers.json").read_text())
+        weights = {
+            key: np.load(path / filename, mmap_mode="r" if mmap else None, allow_pickle=False)
+            for key, filename in manifest["weights"].items()
+        }
+        return cls(manifest["layers"], weights)
+
+    @classmethod
+    def from_h5(cls, path=H5_PATH):
+        """Read layer config and weights straight from a Keras .h5 file."""
+        import h5py
+
+        layers, weights = [], {}
+        with h5py.File(path, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            for layer in config["config"]["layers"]:
+                kind = layer["class_name"]
+                cfg = layer["config"]
+                name = cfg["name"]
+                if kind in ("InputLayer", "Dropout"):
+                    continue
+                if kind not in ("LSTM", "Dense"):
+                    raise ValueError(f"Unsupported layer type: {kind}")
+                group = f["model_weights"][name]
+                for weight_name in group.attrs["weight_names"]:
+                    weight_name = weight_name.decode() if isinstance(weight_name, bytes) else weight_name
+                    key = weight_name.rsplit("/", 1)[-1]
+                    weights[f"{name}/{key}"] = group[weight_name][()]
+                spec = {"type": kind, "name": name, "activation": cfg.get("activation", "linear")}
+                if kind == "LSTM":
+                    if cfg.get("go_backwards") or cfg.get("stateful"):
+                        raise ValueError(f"Unsupported LSTM options in layer {name}")
+                    spec["units"] = cfg["units"]
+                    spec["recurrent_activation"] = cfg.get("recurrent_activation", "sigmoid")
+                    spec["return_sequences"] = cfg.get("return_sequences", False)
+                spec["use_bias"] = cfg.get("use_bias", True)
+                layers.append(spec)
+        return cls(layers, weights)
+
+    def save(self, path=WEIGHTS_PATH):
+        np.savez_compressed(path, __layers__=np.array(json.dumps(self.layers)), **self.weights)
+
+    def save_dir(self, path):
+        """Save one uncompressed .npy per weight so the files can be memory-mapped."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for key, value in self.weights.items():
+            filename = key.replace("/", "__") + ".npy"
+            np.save(path / filename, value)
+            files[key] = filename
+        (path / "layers.json").write_text(json.dumps({"layers": self.layers, "weights": files}))
+
+    def _lstm(self, spec, x):
+        name = spec["name"]
+        units = spec["units"]
+        kernel = self.weights[f"{name}/kernel"]
+        recurrent = self.weights[f"{name}/recurrent_kernel"]
+        bias = self.weights.get(f"{name}/bias") if spec["use_bias"] else None
+        act = _activation(spec["activation"])
+        rec_act = _activation(spec["recurrent_activation"])
+
+        batch, steps, _ = x.shape
+        # Input projection for all timesteps at once: (batch, steps, 4 * units)
+        projected = x @ kernel
+        if bias is not None:
+            projected = projected + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+        for t in range(steps):
+            z = projected[:, t, :] + h @ recurrent
+            # Keras gate order: input, forget, cell, output
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+            if spec["return_sequences"]:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if spec["return_sequences"] else h
+
+    def _dense(self, spec, x):
+        name = spec["name"]
+        y = x @ self.weights[f"{name}/kernel"]
+        if spec["use_bias"]:
+            y = y + self.weights[f"{name}/bias"]
+        return _activation(spec["activation"])(y)
+
+    def predict(self, X, **kwargs):
+        """Forward pass over a (batch, timesteps, features) array."""
+        x = np.asarray(X, dtype=np.float32)
+        for spec in self.layers:
+            x = self._lstm(spec, x) if spec["type"] == "LSTM" else self._dense(spec, x)
+        return x
+
+
+def export_weights(h5_path=H5_PATH, out_path=WEIGHTS_PATH):
+    """Extract the LSTM/Dense weights from the .h5 into a NumPy weight file."""
+    model = NumpyLSTMModel.from_h5(h5_path)
+    model.save(out_path)
+    return model
+
+
+DATASET_PATH = MODELS_DIR.parent / "raw_nba_dataset.csv"
+SCALER_PATH = MODELS_DIR / "minmax_scaler.pkl"
+# Per-game columns of a model input sequence, in order (main.RAW_SEQUENCE_COLS)
+SEQUENCE_COLS = ["pts", "min", "fg_pct", "home", "opp_def_rating", "injury_flag"]
+
+
+def dataset_sequences(steps, data_path=DATASET_PATH, scaler_path=SCALER_PATH, n=512, seed=0):
+    """Sample `n` windows of `steps` consecutive games of one player from the dataset.
+
+    Returns (raw, scaled): the per-game values as served, and the same windows
+    with the scaler's columns min-max scaled as in training.
+    """
+    import joblib
+
+    from services.dataset_store import read_dataset_csv
+
+    data = read_dataset_csv(data_path).sort_values("player_id", kind="stable")
+    values = data[SEQUENCE_COLS].fillna(0).to_numpy(dtype=np.float32)
+    player = data["player_id"].to_numpy()
+    # A window may start at row i if rows i..i+steps-1 belong to the same player
+    starts = np.flatnonzero(player[:len(player) - steps + 1] == player[steps - 1:])
+    if len(starts) == 0:
+        raise ValueError(f"No player in {data_path} has {steps} games")
+    rng = np.random.default_rng(seed)
+    starts = rng.choice(starts, size=min(n, len(starts)), replace=False)
+    raw = values[starts[:, None] + np.arange(steps)]
+
+    scaler = joblib.load(scaler_path)
+    scaled = raw.copy()
+    for j, col in enumerate(scaler.feature_names_in_):
+        k = SEQUENCE_COLS.index(col)
+        scaled[:, :, k] = raw[:, :, k] * scaler.scale_[j] + scaler.min_[j]
+    return raw, scaled
+
+
+def check_parity(numpy_model, h5_path=H5_PATH, **kwargs):
+    """Compare NumPy and Keras outputs on dataset sequences; return max abs diff.
+
+    Checks both the scaled windows the model was trained on and the raw
+    windows the API falls back to, and returns the larger difference.
+    """
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(str(h5_path), compile=False)
+    steps = keras_model.input_shape[1]
+    diff = 0.0
+    for X in dataset_sequences(steps, **kwargs):
+        expected = keras_model.predict(X, verbose=0)
+        actual = numpy_model.predict(X)
+        diff = max(diff, float(np.max(np.abs(expected - actual))))
+    return diff
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--export", action="store_true", help=f"rewrite the weight file from {H5_PATH.name}")
+    parser.add_argument("--check", action="store_true", help="compare the weight file with Keras on dataset sequences")
+    parser.add_argument("--weights", default=str(WEIGHTS_PATH), help="weight file to write/check")
+    args = parser.parse_args()
+    if not (args.export or args.check):
+        parser.error("nothing to do: pass --export and/or --check")
+
+    if args.export:
+        export_weights(out_path=args.weights)
+        print(f"Saved NumPy weights to {args.weights}")
+    if args.check:
+        diff = check_parity(NumpyLSTMModel.load(args.weights))
+        print(f"Max abs difference vs Keras: {diff:.2e}")
+        if diff > 1e-4:
+            sys.exit(1)
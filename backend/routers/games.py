@@ -1,16 +1,18 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 
-try:
-    from nba_api.live.nba.endpoints import scoreboard
-except Exception:
-    scoreboard = None
+from schemas import Game
+from services import upstream
+from services.live_cache import LiveCache
+from utils import fast_json
 
 router = APIRouter(prefix="/api", tags=["games"])
 
-_cache = {"ts": None, "data": None}
-_CACHE_TTL = timedelta(seconds=60)
+# Fresh for 60s; up to 5 min old is served while a refresh runs, and up to
+# an hour old if stats.nba.com is failing
+_cache = LiveCache(ttl=60, stale_while_revalidate=300, stale_if_error=3600)
 
 
 def _extract_games(sb_dict: dict) -> List[dict]:
@@ -31,56 +33,102 @@ def _extract_games(sb_dict: dict) -> List[dict]:
     return out
 
 
-def _fetch_date(date_str: str) -> List[dict]:
-    if scoreboard is None:
-        return []
-    try:
-        sb = scoreboard.ScoreBoard(gameDate=date_str)
-        return _extract_games(sb.get_dict())
-    except Exception:
-        return []
+async def _fetch_date(date_str: str) -> List[dict]:
+    sb = await upstream.client.get_json("scoreboardv3", {"GameDate": date_str, "LeagueID": "00"})
+    return _extract_games(sb)
 
 
-@router.get("/games")
-def get_games():
-    now = datetime.now(timezone.utc)
-    if _cache["ts"] and _cache["data"] and (now - _cache["ts"]) < _CACHE_TTL:
-        return _cache["data"]
+def _sample_games(now: datetime) -> List[dict]:
+    return [
+        {
+            "game_id": "sample-final",
+            "home_team": "Los Angeles Lakers",
+            "away_team": "Boston Celtics",
+            "home_score": 112,
+            "away_score": 108,
+            "status": "Final",
+            "start_time_utc": (now - timedelta(days=1)).isoformat().replace("+00:00", "Z"),
+        },
+        {
+            "game_id": "sample-upcoming",
+            "home_team": "Golden State Warriors",
+            "away_team": "Phoenix Suns",
+            "home_score": None,
+            "away_score": None,
+            "status": "Scheduled",
+            "start_time_utc": (now + timedelta(days=1)).isoformat().replace("+00:00", "Z"),
+        },
+    ]
 
+
+async def _load_games() -> List[dict]:
+    now = datetime.now(timezone.utc)
     today = now.date()
     yesterday = today - timedelta(days=1)
     tomorrow = today + timedelta(days=1)
 
-    # Fetch yesterday, today, tomorrow
-    all_games: List[dict] = []
-    for d in (yesterday, today, tomorrow):
-        ds = d.strftime("%Y-%m-%d")
-        all_games.extend(_fetch_date(ds))
-
-    # Fallback sample if nothing returned
-    if not all_games:
-        sample = [
-            {
-                "game_id": "sample-final",
-                "home_team": "Los Angeles Lakers",
-                "away_team": "Boston Celtics",
-                "home_score": 112,
-                "away_score": 108,
-                "status": "Final",
-                "start_time_utc": (now - timedelta(days=1)).isoformat().replace("+00:00", "Z"),
-            },
-            {
-                "game_id": "sample-upcoming",
-                "home_team": "Golden State Warriors",
-                "away_team": "Phoenix Suns",
-                "home_score": None,
-                "away_score": None,
-                "status": "Scheduled",
-                "start_time_utc": (now + timedelta(days=1)).isoformat().replace("+00:00", "Z"),
-            },
-        ]
-        all_games = sample
-
-    _cache["ts"] = now
-    _cache["data"] = all_games
-    return all_games
+    # Fetch yesterday, today, tomorrow concurrently
+    per_date = await asyncio.gather(
+        *(_fetch_date(d.strftime("%Y-%m-%d")) for d in (yesterday, today, tomorrow)),
+        return_exceptions=True,
+    )
+    failed = [r for r in per_date if isinstance(r, Exception)]
+    if len(failed) == len(per_date):
+        # Nothing to cache: the cache serves the last good scoreboard (and the
+        # route the sample games) and the background refresher backs off
+        raise failed[0]
+    return [g for games in per_date if not isinstance(games, Exception) for g in games]
+
+
+def _in_game_window(games: List[dict], now: datetime) -> bool:
+    """True if a cached game tips off within 30 min or started in the last 4h and isn't final."""
+    for g in games:
+        status = str(g.get("status") or "")
+        try:
+            start = datetime.fromisoformat(str(g.get("start_time_utc")).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if now - timedelta(hours=4) <= start <= now + timedelta(minutes=30) and not status.startswith("Final"):
+            return True
+    return False
+
+
+# Background refresh intervals (see services/refresher.py): stay inside the
+# TTL while games are on, and inside the stale-while-revalidate window otherwise
+GAME_WINDOW_REFRESH_SECONDS = 30
+IDLE_REFRESH_SECONDS = 240
+
+
+def refresh_interval() -> float:
+    entry = _cache.peek("games")
+    if entry is not None and _in_game_window(entry.value, datetime.now(timezone.utc)):
+        return GAME_WINDOW_REFRESH_SECONDS
+    return IDLE_REFRESH_SECONDS
+
+
+async def refresh_games():
+    await _cache.refresh("games", _load_games)
+
+
+def cache_stats() -> dict:
+    """Counters for the scoreboard cache (hits, misses, evictions, size)."""
+    return _cache.get_stats()
+
+
+@router.get("/games", response_model=List[Game])
+async def get_games():
+    try:
+        entry = await _cache.get("games", _load_games)
+    except Exception:
+        # Every fetch failed and there is no scoreboard recent enough to serve
+        return fast_json.respond(_sample_games(datetime.now(timezone.utc)))
+    # Fallback sample if no games were returned
+    return fast_json.respond(entry.value or _sample_games(datetime.now(timezone.utc)))
+
+
+@router.get("/games/cache/stats")
+def games_cache_stats():
+    """Return counters for the scoreboard cache (hits, misses, evictions, size)."""
+    return cache_stats()
@@ -5,6 +5,12 @@ router = APIRouter(prefix="/api/nba", tags=["nba_api"])
 
 
 @router.get("/player/{player_id}/season-stats")
-def player_latest_season_stats(player_id: int):
+async def player_latest_season_stats(player_id: int):
     """Return latest season aggregate stats for a player (cached)."""
-    return nba_live_service.get_player_latest_season_stats(player_id)
+    return await nba_live_service.get_player_latest_season_stats(player_id)
+
+
+@router.get("/cache/stats")
+def season_stats_cache_stats():
+    """Return counters for the season-stats cache (hits, misses, evictions, size)."""
+    return nba_live_service.cache_stats()
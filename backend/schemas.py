@@ -0,0 +1,86 @@
+"""Response models for the hot read endpoints.
+
+They document the response shapes in the OpenAPI schema and, set as a
+route's response_model, let FastAPI validate the returned dicts and encode
+them straight to JSON bytes with pydantic's serializer instead of
+jsonable_encoder + json.dumps. Field names and order match the dicts the
+routes already build, so the JSON is unchanged.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class Player(BaseModel):
+    player_id: int
+    player_name: str
+
+
+class RecentGame(BaseModel):
+    game_date: Optional[str] = None
+    pts: Optional[int] = None
+    min: Optional[float] = None
+    fg_pct: Optional[float] = None
+
+
+class GameRecord(BaseModel):
+    date: Optional[str] = None
+    pts: Optional[int] = None
+    min: Optional[float] = None
+    fg_pct: Optional[float] = None
+
+
+class PredictionSummary(BaseModel):
+    avg_pts_5: float
+    avg_min_5: float
+    pts_trend: float
+
+
+class Confidence(BaseModel):
+    band: float
+    std: float
+    label: str
+
+
+class FormSummary(BaseModel):
+    avg_pts_5: float
+    minutes_stability: str
+    scoring_trend: str
+
+
+class TeamInfo(BaseModel):
+    team_name: Optional[str] = None
+    city: Optional[str] = None
+    conference: Optional[str] = None
+    abbreviation: Optional[str] = None
+    colors: Optional[List[str]] = None
+    logo_url: Optional[str] = None
+
+
+class Prediction(BaseModel):
+    player_id: int
+    predicted_points: float
+    model_prediction: float
+    recent_avg_points: Optional[float] = None
+    recent_games: List[GameRecord]
+    summary: PredictionSummary
+    confidence: Confidence
+    explanation: str
+    form_summary: FormSummary
+    avg_error_last_10: Optional[float] = None
+    team: TeamInfo
+
+
+class BatchPrediction(BaseModel):
+    predictions: List[Prediction]
+    not_found: List[int]
+
+
+class Game(BaseModel):
+    game_id: Optional[str] = None
+    home_team: Optional[str] = None
+    away_team: Optional[str] = None
+    home_score: Optional[int] = None
+    away_score: Optional[int] = None
+    status: Optional[str] = None
+    start_time_utc: Optional[str] = None
@@ -0,0 +1,274 @@
+"""Columnar on-disk format for the game-log dataset.
+
+`build_columnar` converts the CSV written by `build_raw_dataset` into a
+directory with one .npy file per column plus a `meta.json`. Rows are sorted by
+(player_id, game_date) and already carry the rolling features, so loading is
+just memory-mapping the arrays: no date parsing, no sorting, no feature pass,
+and workers on the same box share the page cache instead of private copies.
+
+Build it (after refreshing the CSV) with:
+
+    python -m services.dataset_store
+"""
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.preprocess import ROLLING_FEATURES, compute_rolling_features
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = BACKEND_DIR / "raw_nba_dataset.csv"
+COLUMNAR_DIR = BACKEND_DIR / "data" / "nba_dataset"
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+# Dates in the CSV look like "Apr 03, 2022"
+CSV_DATE_FORMAT = "%b %d, %Y"
+# String columns are stored as integer codes + a category list (object
+# arrays cannot be memory-mapped)
+CATEGORICAL_COLUMNS = ("player_name", "season")
+
+
+def read_dataset_csv(path=CSV_PATH) -> pd.DataFrame:
+    """Read the raw CSV with an explicit date format, sorted by game_date."""
+    data = pd.read_csv(path)
+    try:
+        data["game_date"] = pd.to_datetime(data["game_date"], format=CSV_DATE_FORMAT)
+    except (ValueError, TypeError):
+        # Older/hand-edited files: fall back to per-value inference
+        data["game_date"] = pd.to_datetime(data["game_date"], errors="coerce")
+    return data.sort_values("game_date")
+
+
+def _source_stat(path) -> Optional[dict]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def write_columnar(df: pd.DataFrame, out_dir=COLUMNAR_DIR, source=None, players: Optional[List[dict]] = None):
+    """Write a feature-complete frame as per-column .npy files plus meta.json."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if players is None:
+        players = df[["player_id", "player_name"]].drop_duplicates().to_dict(orient="records")
+    order = np.lexsort((df["game_date"].to_numpy(), df["player_id"].to_numpy()))
+    ordered = df.iloc[order].reset_index(drop=True)
+
+    columns, categories = [], {}
+    for col in ordered.columns:
+        values = ordered[col]
+        if col in CATEGORICAL_COLUMNS or values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+            col_codes, uniques = pd.factorize(values)
+            array = col_codes.astype(np.int32)
+            categories[col] = [str(u) for u in uniques]
+        else:
+            array = values.to_numpy()
+        # Write-then-rename: processes that still map the old file keep a
+        # valid (unlinked) copy instead of seeing it truncated underneath them.
+        tmp = out_dir / f"{col}.npy.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, out_dir / f"{col}.npy")
+        columns.append(col)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "rows": len(ordered),
+        "columns": columns,
+        "categories": categories,
+        "players": [{"player_id": int(p["player_id"]), "player_name": str(p["player_name"])} for p in players],
+        "rolling_features": [list(f) for f in ROLLING_FEATURES],
+        "source": _source_stat(source) if source is not None else None,
+    }
+    # Write meta last so a half-written directory is never picked up
+    tmp = out_dir / (META_FILE + ".tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, out_dir / META_FILE)
+    return out_dir
+
+
+def build_columnar(csv_path=CSV_PATH, out_dir=COLUMNAR_DIR):
+    """Convert the raw CSV into the columnar format (with rolling features)."""
+    df = compute_rolling_features(read_dataset_csv(csv_path))
+    return write_columnar(df, out_dir, source=csv_path)
+
+
+def update_columnar(new_rows: pd.DataFrame, csv_path=CSV_PATH, out_dir=COLUMNAR_DIR):
+    """Fold rows just appended to the CSV into the columnar dataset.
+
+    Rolling features are recomputed only for the players that got new games;
+    everyone else's rows are carried over unchanged. Falls back to a full
+    `build_columnar` when there is no usable columnar copy yet.
+    """
+    meta = read_meta(out_dir)
+    if meta is None or meta.get("format_version") != FORMAT_VERSION \
+            or meta.get("rolling_features") != [list(f) for f in ROLLING_FEATURES]:
+        return build_columnar(csv_path, out_dir)
+    if new_rows is None or new_rows.empty:
+        return Path(out_dir)
+
+    existing, meta = load_columnar(out_dir, mmap=False)
+    for col in meta["categories"]:
+        existing[col] = existing[col].astype(object)
+
+    new_rows = new_rows.copy()
+    try:
+        new_rows["game_date"] = pd.to_datetime(new_rows["game_date"], format=CSV_DATE_FORMAT)
+    except (ValueError, TypeError):
+        new_rows["game_date"] = pd.to_datetime(new_rows["game_date"], errors="coerce")
+
+    affected = existing["player_id"].isin(new_rows["player_id"].unique())
+    raw_columns = list(new_rows.columns)
+    history = pd.concat([existing.loc[affected, raw_columns], new_rows], ignore_index=True)
+    refreshed = compute_rolling_features(history.sort_values("game_date"))
+    combined = pd.concat([existing.loc[~affected], refreshed[existing.columns]], ignore_index=True)
+
+    players = list(meta["players"])
+    known = {p["player_id"] for p in players}
+    for rec in new_rows[["player_id", "player_name"]].drop_duplicates().to_dict(orient="records"):
+        if int(rec["player_id"]) not in known:
+            players.append(rec)
+            known.add(int(rec["player_id"]))
+    return write_columnar(combined, out_dir, source=csv_path, players=players)
+
+
+def read_meta(data_dir=COLUMNAR_DIR) -> Optional[dict]:
+    try:
+        return json.loads((Path(data_dir) / META_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(meta: Optional[dict], csv_path=CSV_PATH) -> bool:
+    """True if the columnar copy was built from the current CSV (or there is no CSV)."""
+    if meta is None or meta.get("format_version") != FORMAT_VERSION:
+        return False
+    if meta.get("rolling_features") != [list(f) for f in ROLLING_FEATURES]:
+        return False
+    current = _source_stat(csv_path)
+    return current is None or meta.get("source") == current
+
+
+def load_columnar(data_dir=COLUMNAR_DIR, mmap=True):
+    """Load the columnar dataset as a DataFrame backed by memory-mapped arrays.
+
+    Returns (df, meta). Numeric columns stay views onto the mapped files.
+    """
+    data_dir = Path(data_dir)
+    meta = read_meta(data_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar dataset in {data_dir}")
+    mode = "r" if mmap else None
+    data = {}
+    for col in meta["columns"]:
+        values = np.load(data_dir / f"{col}.npy", mmap_mode=mode, allow_pickle=False)
+        if col in meta["categories"]:
+            values = pd.Categorical.from_codes(values, categories=meta["categories"][col])
+        data[col] = values
+    return pd.DataFrame(data, copy=False), meta
+
+
+# -----------------------------
+# Partitioned layout (full league, many seasons)
+# -----------------------------
+# root/manifest.json
+# root/season=2023-24/bucket=007/{<column>.npy, meta.json}
+# A player's rows for a season live in bucket player_id % buckets, so one
+# player's full history is the same bucket across every season partition.
+PARTITIONS_DIR = BACKEND_DIR / "data" / "partitions"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_BUCKETS = 32
+
+
+def _partition_dir(root, season, bucket) -> Path:
+    return Path(root) / f"season={season}" / f"bucket={bucket:03d}"
+
+
+def write_partitions(df: pd.DataFrame, root=PARTITIONS_DIR, buckets: int = DEFAULT_BUCKETS):
+    """Write a feature-complete frame as season × player-bucket partitions.
+
+    Rolling features must already be computed over each player's full
+    history (they carry across season boundaries). The manifest lists the
+    partitions written, so directories left over from an earlier build with
+    other seasons or bucket counts are never read.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    players = df[["player_id", "player_name"]].drop_duplicates("player_id").to_dict(orient="records")
+    bucket_ids = df["player_id"] % buckets
+
+    seasons = sorted(df["season"].dropna().unique())
+    partitions = {}
+    for season in seasons:
+        in_season = df["season"] == season
+        written = partitions[str(season)] = []
+        for bucket in sorted(bucket_ids[in_season].unique()):
+            part = df[in_season & (bucket_ids == bucket)]
+            write_columnar(part, _partition_dir(root, season, int(bucket)))
+            written.append(int(bucket))
+
+    opp_def = df["opp_def_rating"]
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "buckets": buckets,
+        "seasons": [str(s) for s in seasons],
+        "partitions": partitions,
+        "rows": len(df),
+        "rolling_features": [list(f) for f in ROLLING_FEATURES],
+        "league_opp_def_mean": None if opp_def.isna().all() else float(opp_def.mean()),
+        "players": [
+            {"player_id": int(p["player_id"]), "player_name": str(p["player_name"]), "bucket": int(p["player_id"]) % buckets}
+            for p in players
+        ],
+    }
+    tmp = root / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, root / MANIFEST_FILE)
+    return root
+
+
+def read_manifest(root=PARTITIONS_DIR) -> Optional[dict]:
+    try:
+        return json.loads((Path(root) / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def load_bucket(root, bucket: int, manifest: Optional[dict] = None) -> pd.DataFrame:
+    """Materialize one player bucket across all seasons, sorted by player and date.
+
+    Only partitions listed in the manifest are read (manifests written before
+    the list was recorded fall back to whichever partition directories exist).
+    """
+    manifest = manifest or read_manifest(root)
+    partitions = manifest.get("partitions")
+    frames = []
+    for season in manifest["seasons"]:
+        if partitions is not None and bucket not in partitions.get(season, ()):
+            continue
+        part_dir = _partition_dir(root, season, bucket)
+        if (part_dir / META_FILE).exists():
+            part, _ = load_columnar(part_dir)
+            for col in part.columns:
+                if isinstance(part[col].dtype, pd.CategoricalDtype):
+                    part[col] = part[col].astype(object)
+            frames.append(part)
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index=True)
+    order = np.lexsort((data["game_date"].to_numpy(), data["player_id"].to_numpy()))
+    return data.iloc[order].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    out = build_columnar()
+    meta = read_meta(out)
+    print(f"✅ Wrote columnar dataset to {out} ({meta['rows']} rows, {len(meta['players'])} players)")
@@ -0,0 +1,151 @@
+"""Feature engineering and prediction analytics on a player's raw arrays.
+
+Functions take a `{column: ndarray}` window (`PlayerIndex.arrays`) or, for a
+batch of players, stacked windows (`PlayerIndex.stacked`). Means and standard
+deviations follow pandas' NumPy path (NaNs skipped, two-pass variance, same
+summation order), so they match `Series.mean()`/`Series.std(ddof=0)` exactly.
+"""
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Columns read for a prediction; the rolling ones may be absent from old data
+WINDOW_COLUMNS = (
+    "game_date", "pts", "min", "fg_pct", "home", "opp_def_rating", "injury_flag",
+    "pts_rolling_5", "pts_rolling_10",
+)
+# avg_error_last_10 scores each of the last 10 games against the 5 before it
+ERROR_GAMES = 10
+BASELINE_GAMES = 5
+HISTORY_GAMES = ERROR_GAMES + BASELINE_GAMES
+
+
+def _as_float(values: np.ndarray) -> np.ndarray:
+    return values if values.dtype.kind == "f" else values.astype(np.float64)
+
+
+def nanmean(values: np.ndarray) -> float:
+    """Mean ignoring NaNs (NaN if there are none), like `Series.mean()`."""
+    values = _as_float(values)
+    mask = np.isnan(values)
+    count = values.size - int(mask.sum())
+    if count == 0:
+        return float("nan")
+    return float(np.where(mask, 0.0, values).sum() / count)
+
+
+def nanstd(values: np.ndarray) -> float:
+    """Population std ignoring NaNs, like `Series.std(ddof=0)`."""
+    values = _as_float(values)
+    mask = np.isnan(values)
+    count = values.size - int(mask.sum())
+    if count == 0:
+        return float("nan")
+    filled = np.where(mask, 0.0, values)
+    avg = filled.sum() / count
+    sqr = (avg - filled) ** 2
+    sqr[mask] = 0.0
+    return float(np.sqrt(sqr.sum() / count))
+
+
+def _is_nan(value) -> bool:
+    return isinstance(value, (float, np.floating)) and math.isnan(value)
+
+
+def tail(window: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """Last `n` games of a window, or of each row of stacked windows (views, no copies)."""
+    return {name: values[..., -n:] for name, values in window.items()}
+
+
+def _row_nanmean(values: np.ndarray, real: np.ndarray) -> np.ndarray:
+    """`nanmean` of each row over its `real` slots."""
+    mask = ~real | np.isnan(values)
+    count = values.shape[1] - mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(mask, 0.0, values).sum(axis=1) / count
+    means[count == 0] = np.nan
+    return means
+
+
+def engineer_features_batch(last_n: Dict[str, np.ndarray], lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Engineered features for many players at once, one array per feature.
+
+    `last_n` holds (players, games) arrays right-aligned as returned by
+    `PlayerIndex.stacked`, with `lengths[i]` (at least 1) real games in row i.
+    """
+    pts = _as_float(last_n["pts"])
+    rows, games = pts.shape
+    first = games - lengths
+    real = np.arange(games) >= first[:, None]
+    avg_pts_5 = _row_nanmean(pts, real)
+    avg_min_5 = _row_nanmean(_as_float(last_n["min"]), real)
+    # pts_trend: (last - first) / number_of_games
+    pts_trend = (pts[:, -1] - pts[np.arange(rows), first]) / lengths
+    # home_next: use last game's home flag as a proxy
+    home = last_n["home"][:, -1]
+    home_next = (np.where(np.isnan(home), 0, home) if home.dtype.kind == "f" else home).astype(np.int64)
+    # opponent defensive rating: use last game's opp_def_rating
+    opp = _as_float(last_n["opp_def_rating"][:, -1])
+    opp_def = np.where(np.isnan(opp), 0.0, opp)
+    # rolling features from dataset (with safe fallback to avg_pts_5)
+    rolling = {}
+    for name in ("pts_rolling_5", "pts_rolling_10"):
+        values = last_n.get(name)
+        last = avg_pts_5 if values is None else _as_float(values[:, -1])
+        rolling[name] = np.where(np.isnan(last), avg_pts_5, last)
+
+    return {
+        "avg_pts_5": avg_pts_5,
+        "avg_min_5": avg_min_5,
+        "pts_trend": pts_trend,
+        "home_next": home_next,
+        "opp_def": opp_def,
+        "pts_rolling_5": rolling["pts_rolling_5"],
+        "pts_rolling_10": rolling["pts_rolling_10"],
+    }
+
+
+def game_records(last_n: Dict[str, np.ndarray], date_key: str = "date") -> List[dict]:
+    """Per-game {date, pts, min, fg_pct} dicts for the response (None for missing)."""
+    dates = last_n["game_date"]
+    date_strs = np.datetime_as_string(dates, unit="D")
+    missing_date = np.isnat(dates)
+    records = []
+    for i in range(len(dates)):
+        pts, minutes, fg_pct = last_n["pts"][i], last_n["min"][i], last_n["fg_pct"][i]
+        records.append(
+            {
+                date_key: None if missing_date[i] else str(date_strs[i]),
+                "pts": None if _is_nan(pts) else int(pts),
+                "min": None if _is_nan(minutes) else float(minutes),
+                "fg_pct": None if _is_nan(fg_pct) else float(fg_pct),
+            }
+        )
+    return records
+
+
+def spread(values: np.ndarray) -> float:
+    """Population std of the window, 0.0 when every value is missing."""
+    std = nanstd(values)
+    return 0.0 if math.isnan(std) else std
+
+
+def avg_error_last_10(pts: np.ndarray) -> Optional[float]:
+    """Mean absolute error of a previous-5-game-mean baseline over the last 10 games.
+
+    `pts` must hold at least the player's last HISTORY_GAMES games (or all of
+    them). Games without 5 predecessors are skipped; None if none qualify.
+    """
+    pts = _as_float(pts[-HISTORY_GAMES:])
+    if len(pts) <= BASELINE_GAMES:
+        return None
+    windows = np.lib.stride_tricks.sliding_window_view(pts[:-1], BASELINE_GAMES)
+    mask = np.isnan(windows)
+    counts = BASELINE_GAMES - mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        baselines = np.where(mask, 0.0, windows).sum(axis=1) / counts
+    baselines[counts == 0] = np.nan
+    errors = np.abs(baselines - pts[BASELINE_GAMES:])[-ERROR_GAMES:]
+    # Sum newest-first as Python floats
+    return round(float(sum(errors[::-1].tolist()) / len(errors)), 2)
@@ -0,0 +1,178 @@
+"""Rate-limited, retrying, cached fetches for the dataset build.
+
+stats.nba.com throttles aggressive clients, so every upstream call goes
+through a shared token bucket (steady `rate` calls/sec with a small `burst`)
+while a bounded thread pool keeps several requests in flight. Timeouts,
+connection errors, 429s and 5xx responses are retried with exponential
+backoff and jitter; anything still failing is reported in `failures` rather
+than dropped. Successful responses can be kept in an on-disk cache so a
+rerun does not hit the API again for data it already has; callers pass
+`use_cache=False` for data that can still change (current season,
+incremental fetches).
+
+Fetch functions are plain callables returning a DataFrame, so tests and
+benchmarks can run the scheduler against a local stub instead of nba_api.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+import requests
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UpstreamHTTPError(Exception):
+    """Upstream answered with a non-success status (e.g. 429)."""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"upstream returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(exc, UpstreamHTTPError):
+        return exc.status_code in RETRYABLE_STATUS
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/sec, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """On-disk cache of DataFrame responses keyed by endpoint + parameters."""
+
+    def __init__(self, directory, ttl: Optional[float] = None):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, endpoint: str, params: dict) -> Path:
+        key = json.dumps({"endpoint": endpoint, "params": params}, sort_keys=True, default=str)
+        return self.directory / f"{endpoint}-{hashlib.sha1(key.encode()).hexdigest()[:20]}.json"
+
+    def get(self, endpoint: str, params: dict) -> Optional[pd.DataFrame]:
+        path = self._path(endpoint, params)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return pd.read_json(StringIO(path.read_text()), orient="split", dtype=False)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, endpoint: str, params: dict, frame: pd.DataFrame):
+        path = self._path(endpoint, params)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(frame.to_json(orient="split", index=False))
+        tmp.replace(path)
+
+
+class FetchScheduler:
+    def __init__(
+        self,
+        rate: float = 1.5,
+        burst: int = 2,
+        max_workers: int = 4,
+        max_retries: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.stats = {"calls": 0, "cache_hits": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch(
+        self, endpoint: str, params: dict, fetch_fn: Callable[..., pd.DataFrame], use_cache: bool = True
+    ) -> pd.DataFrame:
+        """Call `fetch_fn(**params)` under the rate limit, retrying transient errors.
+
+        With `use_cache=False` the response cache is neither read nor written.
+        """
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(endpoint, params)
+            if cached is not None:
+                self._count("cache_hits")
+                return cached
+
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._count("calls")
+            try:
+                frame = fetch_fn(**params)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                attempt += 1
+                self._count("retries")
+                delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+                time.sleep(delay * (0.5 + random.random() / 2))
+
+        if cache is not None and frame is not None:
+            cache.put(endpoint, params, frame)
+        return frame
+
+    def map(
+        self, jobs: Iterable[Tuple[Hashable, str, dict, Callable[..., pd.DataFrame], bool]]
+    ) -> Tuple[Dict[Hashable, pd.DataFrame], Dict[Hashable, Exception]]:
+        """Run (key, endpoint, params, fetch_fn, use_cache) jobs concurrently.
+
+        Returns (results, failures), both keyed by job key.
+        """
+        jobs = list(jobs)
+        results, failures = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nba-fetch") as pool:
+            futures = {
+                pool.submit(self.fetch, endpoint, params, fn, use_cache): key
+                for key, endpoint, params, fn, use_cache in jobs
+            }
+            for fut, key in futures.items():
+                try:
+                    results[key] = fut.result()
+                except Exception as e:
+                    self._count("failures")
+                    failures[key] = e
+        return results, failures
@@ -0,0 +1,104 @@
+"""Micro-batching for model inference.
+
+`InferenceBatcher` queues model inputs from the threadpool's sync routes; a
+single worker thread runs one forward pass over whatever is queued and hands
+each caller back its own rows. A lone request is dispatched at once; only
+when other requests are already queued behind it does the worker keep
+collecting, for up to `max_wait_ms` (or until `max_batch_size` rows).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+
+class InferenceBatcher:
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 3.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait > 0
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Run `predict_fn` on X, batched with any concurrent callers.
+
+        Blocks until the result is ready. With a zero wait window batching is
+        disabled and `predict_fn` is called inline.
+        """
+        if not self.enabled:
+            return self.predict_fn(X)
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((X, fut))
+        return fut.result()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        """Block for the first request, then take whatever else is queued.
+
+        If nothing was queued behind the first request it is dispatched
+        straight away; otherwise keep gathering until the window closes.
+        """
+        batch = [self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        if len(batch) == 1:
+            return batch
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Inputs of different shapes (e.g. scaled vs. raw-sequence) cannot
+            # share a forward pass, so run one pass per input shape.
+            by_shape = {}
+            for X, fut in batch:
+                by_shape.setdefault(X.shape[1:], []).append((X, fut))
+            for items in by_shape.values():
+                self._run_group(items)
+
+    def _run_group(self, items: List[Tuple[np.ndarray, Future]]):
+        try:
+            X = np.concatenate([x for x, _ in items], axis=0)
+            y = self.predict_fn(X)
+        except Exception as e:
+            for _, fut in items:
+                fut.set_exception(e)
+            return
+        offset = 0
+        for x, fut in items:
+            fut.set_result(y[offset:offset + len(x)])
+            offset += len(x)
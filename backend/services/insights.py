@@ -0,0 +1,314 @@
+"""AI insights for a player's prediction, generated by the Gemini API.
+
+* one pooled httpx.AsyncClient is shared by all calls (closed from the app
+  lifespan);
+* generated bullets are cached by a hash of the prompt (player, predicted
+  points and recent games), for INSIGHTS_CACHE_TTL seconds and at most
+  INSIGHTS_CACHE_SIZE prompts;
+* identical prompts in flight at the same time share one Gemini call
+  (LiveCache single-flight);
+* at most INSIGHTS_MAX_CONCURRENCY Gemini calls are outstanding at once;
+  further callers wait for a slot.
+
+`stream_insights` yields bullets one at a time as Gemini produces them when
+GEMINI_STREAM_URL (a streaming generate endpoint answering with SSE chunks)
+is set. Cached prompts are replayed immediately, and a prompt already being
+generated (by either path) is awaited rather than requested twice.
+
+Failures are not cached; the route answers them with fallback bullets.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import ssl
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from services import metrics
+from services.fetch_scheduler import UpstreamHTTPError
+from services.live_cache import LiveCache, MemoryStore
+
+GEMINI_API_URL = os.getenv("GEMINI_API_URL") or "https://api.generative.googleapis.com/v1/models/gemini-1.0:generate"
+GEMINI_STREAM_URL = os.getenv("GEMINI_STREAM_URL")
+# GEMINI_CA_BUNDLE / REQUESTS_CA_BUNDLE: PEM file for corporate proxies or custom CAs
+GEMINI_CA_BUNDLE = os.getenv("GEMINI_CA_BUNDLE") or os.getenv("REQUESTS_CA_BUNDLE")
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "10"))
+MAX_CONCURRENCY = int(os.getenv("INSIGHTS_MAX_CONCURRENCY", "4"))
+CACHE_TTL = float(os.getenv("INSIGHTS_CACHE_TTL", str(6 * 3600)))
+CACHE_SIZE = int(os.getenv("INSIGHTS_CACHE_SIZE", "512"))
+MAX_BULLETS = 6
+
+
+def api_key() -> Optional[str]:
+    return os.environ.get("GEMINI_API_KEY")
+
+
+def build_prompt(player_id: int, predicted_points, recent_games: List[dict]) -> str:
+    """The prompt sent to Gemini; also the cache key, so keep it deterministic."""
+    prompt_lines = [
+        f"Player ID: {player_id}",
+        f"Predicted points: {predicted_points}",
+        "Recent games:",
+    ]
+    for g in recent_games:
+        date = g.get("date") or g.get("game_date")
+        pts = g.get("pts")
+        mins = g.get("min")
+        fg = g.get("fg_pct")
+        prompt_lines.append(f"{date}: {pts} pts, {mins} min, FG% {fg}")
+
+    prompt_lines.append(
+        "Summarize the player's recent performance and expected next game in 4 short bullet points. Focus on form, consistency, minutes, and scoring trend."
+    )
+    return "\n".join(prompt_lines)
+
+
+def extract_text(data) -> Optional[str]:
+    """Pull the generated text out of the response (several API shapes exist)."""
+    text = None
+    if isinstance(data, dict):
+        # models may return candidates or outputs depending on API version
+        if "candidates" in data and data["candidates"]:
+            text = data["candidates"][0].get("content") or data["candidates"][0].get("output")
+        elif "output" in data and isinstance(data["output"], list) and data["output"]:
+            # some responses nest text under output[0].content[0].text
+            o0 = data["output"][0]
+            if isinstance(o0, dict) and isinstance(o0.get("content"), list):
+                parts = []
+                for c in o0["content"]:
+                    if isinstance(c, dict):
+                        if "text" in c:
+                            parts.append(c["text"])
+                        elif "text" in c.get("span", {}):
+                            parts.append(c["span"]["text"])
+                text = "\n".join(parts)
+        if not text:
+            text = data.get("text")
+    return text
+
+
+def to_bullets(text: str) -> List[str]:
+    """Split generated text into at most MAX_BULLETS bullet points."""
+    bullets = [line.strip(" -•\t") for line in text.splitlines() if line.strip()]
+    return (bullets or [text])[:MAX_BULLETS]
+
+
+def is_ssl_error(exc: BaseException) -> bool:
+    """True if `exc` (or what caused it) is a TLS verification failure."""
+    while exc is not None:
+        if isinstance(exc, ssl.SSLError):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class GeminiClient:
+    """Pooled async client for the Gemini generate endpoint with a concurrency cap."""
+
+    def __init__(
+        self,
+        api_url: str = GEMINI_API_URL,
+        stream_url: Optional[str] = GEMINI_STREAM_URL,
+        ca_bundle: Optional[str] = GEMINI_CA_BUNDLE,
+        timeout: float = GEMINI_TIMEOUT,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        self.api_url = api_url
+        self.stream_url = stream_url
+        self.ca_bundle = ca_bundle
+        self.timeout = timeout
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _ssl_context(self):
+        """Default verification, trusting `ca_bundle` instead when one is set."""
+        if self.ca_bundle:
+            return ssl.create_default_context(cafile=self.ca_bundle)
+        return True
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                verify=self._ssl_context(),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _request(prompt: str, key: str):
+        headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+        body = {"prompt": prompt, "maxOutputTokens": 256, "temperature": 0.2}
+        return headers, body
+
+    async def generate(self, prompt: str, key: str) -> List[str]:
+        """Return the bullets Gemini generates for `prompt`.
+
+        Raises UpstreamHTTPError on a non-2xx status, ValueError if the
+        response holds no text, and httpx errors on timeouts/TLS failures.
+        """
+        headers, body = self._request(prompt, key)
+        async with self._slots:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                resp = await self._get_client().post(self.api_url, headers=headers, json=body)
+                if resp.status_code >= 400:
+                    outcome = f"http_{resp.status_code}"
+                    raise UpstreamHTTPError(resp.status_code)
+                data = resp.json()
+                outcome = "ok"
+            except httpx.TimeoutException:
+                outcome = "timeout"
+                raise
+            finally:
+                metrics.upstream_seconds.observe(time.perf_counter() - start, endpoint="gemini")
+                metrics.upstream_requests.inc(endpoint="gemini", outcome=outcome)
+
+        text = extract_text(data)
+        if not text:
+            raise ValueError("No text returned from Gemini")
+        return to_bullets(text)
+
+    async def stream(self, prompt: str, key: str) -> AsyncIterator[str]:
+        """Yield text chunks from the streaming endpoint as they arrive.
+
+        Each SSE `data:` line carries a response in any shape `extract_text`
+        understands; `[DONE]` ends the stream.
+        """
+        headers, body = self._request(prompt, key)
+        async with self._slots:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                async with self._get_client().stream("POST", self.stream_url, headers=headers, json=body) as resp:
+                    if resp.status_code >= 400:
+                        outcome = f"http_{resp.status_code}"
+                        raise UpstreamHTTPError(resp.status_code)
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        text = extract_text(json.loads(data))
+                        if text:
+                            yield text
+                outcome = "ok"
+            except httpx.TimeoutException:
+                outcome = "timeout"
+                raise
+            finally:
+                metrics.upstream_seconds.observe(time.perf_counter() - start, endpoint="gemini_stream")
+                metrics.upstream_requests.inc(endpoint="gemini_stream", outcome=outcome)
+
+
+client = GeminiClient()
+_CACHE = LiveCache(ttl=CACHE_TTL, store=MemoryStore(maxsize=CACHE_SIZE))
+# Prompts being streamed right now -> their full bullet list, for later callers
+_STREAMING: Dict[str, asyncio.Future] = {}
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(f"{client.api_url}\n{prompt}".encode()).hexdigest()
+
+
+async def _await_stream(cache_key: str) -> Optional[List[str]]:
+    """The bullets of a stream in progress for `cache_key`, if there is one.
+
+    None if there is none, or if its client went away before it finished.
+    """
+    streaming = _STREAMING.get(cache_key)
+    if streaming is None:
+        return None
+    try:
+        return await asyncio.shield(streaming)
+    except asyncio.CancelledError:
+        if streaming.cancelled():
+            return None
+        raise
+
+
+async def generate_insights(prompt: str, key: str) -> List[str]:
+    """Cached, deduplicated Gemini bullets for `prompt`."""
+    cache_key = prompt_key(prompt)
+    bullets = await _await_stream(cache_key)
+    if bullets is not None:
+        return bullets
+    entry = await _CACHE.get(cache_key, lambda: client.generate(prompt, key))
+    return entry.value
+
+
+async def stream_insights(prompt: str, key: str) -> AsyncIterator[str]:
+    """Yield the bullets for `prompt` as soon as each one is complete.
+
+    Streams from Gemini only when GEMINI_STREAM_URL is set and the prompt is
+    neither cached nor already being generated; otherwise the bullets come
+    from `generate_insights` and are yielded together. The full set is
+    cached once the stream ends.
+    """
+    cache_key = prompt_key(prompt)
+    if client.stream_url is None or _CACHE.pending(cache_key):
+        for bullet in await generate_insights(prompt, key):
+            yield bullet
+        return
+
+    entry = _CACHE.get_fresh(cache_key)
+    if entry is not None:
+        for bullet in entry.value:
+            yield bullet
+        return
+
+    if cache_key in _STREAMING:
+        # Another request is streaming this prompt; if its client goes away
+        # first, fall back to one single-flight generate call
+        for bullet in await _await_stream(cache_key) or await generate_insights(prompt, key):
+            yield bullet
+        return
+
+    done = _STREAMING[cache_key] = asyncio.get_running_loop().create_future()
+    try:
+        text, sent = "", 0
+        async for chunk in client.stream(prompt, key):
+            text += chunk
+            # Only lines ended by a newline are complete bullets
+            complete = text[: text.rfind("\n") + 1]
+            if complete.strip():
+                for bullet in to_bullets(complete)[sent:]:
+                    yield bullet
+                    sent += 1
+        if not text:
+            raise ValueError("No text returned from Gemini")
+        bullets = to_bullets(text)
+        _CACHE.put(cache_key, bullets)
+        done.set_result(bullets)
+        for bullet in bullets[sent:]:
+            yield bullet
+    except Exception as e:
+        if not done.done():
+            done.set_exception(e)
+            done.exception()  # mark retrieved when nobody was waiting
+        raise
+    except BaseException:
+        # Client went away: waiters fetch the bullets themselves
+        done.cancel()
+        raise
+    finally:
+        _STREAMING.pop(cache_key, None)
+
+
+def cache_stats():
+    """Hit/miss/eviction counters and current size of the insights cache."""
+    return _CACHE.get_stats()
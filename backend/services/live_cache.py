@@ -0,0 +1,270 @@
+"""Async cache for live upstream data (scoreboard, standings, season stats).
+
+On top of a TTL, `LiveCache` provides:
+
+* single-flight: concurrent misses for a key share one in-flight fetch;
+* stale-while-revalidate: for `stale_while_revalidate` seconds after the TTL
+  the old value is returned immediately while one background fetch refreshes
+  it;
+* stale-if-error: if a fetch fails, a value up to `stale_if_error` seconds
+  past its TTL is served instead of the error.
+
+Entries live in a store: `MemoryStore` (bounded LRU, per process) by default,
+or `DiskStore` (JSON files in a directory) so several workers can share one
+cache, e.g. under /dev/shm. Both drop entries too old to ever be served again
+on a periodic sweep.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60.0
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fetched_at: float  # time.time() of the fetch
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class MemoryStore:
+    """In-process LRU store holding at most `maxsize` entries."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, int(maxsize))
+        self.stats = {"evictions": 0, "expirations": 0}
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def expire(self, max_age: float):
+        """Drop entries fetched more than `max_age` seconds ago."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            for key in [k for k, e in self._data.items() if e.fetched_at < cutoff]:
+                del self._data[key]
+                self.stats["expirations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskStore:
+    """One JSON file per entry under `directory`; values must be JSON-serializable.
+
+    Every worker pointed at the same directory sees the same entries. Listing
+    the directory on every write would be wasteful, so the size bound is
+    enforced every `maxsize // 16` writes and on each sweep (least recently
+    used files go first); it can briefly overshoot by that much.
+    """
+
+    def __init__(self, directory, maxsize: int = 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maxsize = max(1, int(maxsize))
+        self.stats = {"evictions": 0, "expirations": 0}
+        self._trim_every = max(1, self.maxsize // 16)
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.json"))
+
+    def _path(self, key: Hashable) -> Path:
+        return self.directory / f"{hashlib.sha1(repr(key).encode()).hexdigest()[:20]}.json"
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text())
+            # mtime doubles as last-use time for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(data["value"], data["fetched_at"])
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"key": repr(key), "fetched_at": entry.fetched_at, "value": entry.value}))
+        os.replace(tmp, path)
+        self._writes += 1
+        if self._writes % self._trim_every == 0:
+            self._trim()
+
+    def _trim(self):
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.maxsize)]:
+            try:
+                path.unlink()
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
+
+    def expire(self, max_age: float):
+        cutoff = time.time() - max_age
+        for path in self.directory.glob("*.json"):
+            try:
+                if json.loads(path.read_text())["fetched_at"] < cutoff:
+                    path.unlink()
+                    self.stats["expirations"] += 1
+            except (OSError, ValueError, KeyError):
+                continue
+        self._trim()
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class LiveCache:
+    def __init__(
+        self,
+        ttl: float,
+        stale_while_revalidate: float = 0.0,
+        stale_if_error: float = 0.0,
+        store=None,
+        sweep_interval: float = SWEEP_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.store = store if store is not None else MemoryStore()
+        self.sweep_interval = sweep_interval
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._last_sweep = time.monotonic()
+
+    @property
+    def max_age(self) -> float:
+        """Age past which an entry can never be served again."""
+        return self.ttl + max(self.stale_while_revalidate, self.stale_if_error)
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the stored entry (fresh or not) without fetching."""
+        return self.store.get(key)
+
+    def get_fresh(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry if it is within its TTL, without fetching (counted as a hit or miss)."""
+        entry = self.store.get(key)
+        if entry is not None and entry.age < self.ttl:
+            self.stats["hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: Hashable, value: Any) -> CacheEntry:
+        """Store a value fetched outside `get` (e.g. assembled from a stream)."""
+        entry = CacheEntry(value, time.time())
+        self.store.set(key, entry)
+        return entry
+
+    def pending(self, key: Hashable) -> bool:
+        """True if a fetch for `key` is in flight."""
+        return key in self._inflight
+
+    def clear(self):
+        self.store.clear()
+
+    def expire(self):
+        """Drop entries older than `max_age` from the store."""
+        self._last_sweep = time.monotonic()
+        self.store.expire(self.max_age)
+
+    async def refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        """Fetch `key` now regardless of age (joining a fetch already in flight)."""
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, **self.store.stats, "size": len(self.store)}
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fetch))
+            task.add_done_callback(lambda t: self._report_failure(key, t))
+            self._inflight[key] = task
+        return task
+
+    async def _run(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        try:
+            entry = CacheEntry(await fetch(), time.time())
+            self.store.set(key, entry)
+            if time.monotonic() - self._last_sweep > self.sweep_interval:
+                self.expire()
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _report_failure(key: Hashable, task: asyncio.Task):
+        # Also marks the exception as retrieved for background refreshes
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Upstream fetch for %r failed: %s", key, task.exception())
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        """Return the entry for `key`, calling `fetch()` when it needs (re)loading.
+
+        Raises whatever `fetch` raised if there is no entry recent enough to
+        serve in its place.
+        """
+        entry = self.store.get(key)
+        if entry is not None:
+            age = entry.age
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return entry
+            if age < self.ttl + self.stale_while_revalidate:
+                self.stats["stale_hits"] += 1
+                self._refresh(key, fetch)
+                return entry
+        self.stats["misses"] += 1
+
+        try:
+            # shield: a cancelled request must not cancel the fetch others await
+            return await asyncio.shield(self._refresh(key, fetch))
+        except Exception:
+            entry = self.store.get(key)
+            if entry is not None and entry.age < self.ttl + self.stale_if_error:
+                return entry
+            raise
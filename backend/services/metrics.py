@@ -0,0 +1,279 @@
+"""In-process metrics with a Prometheus text endpoint, plus opt-in profiling.
+
+Covers where request time goes (per-stage histograms for the prediction
+path, per-route request latency), upstream stats.nba.com latency and errors,
+and cache hit/miss counts. `render()` produces the Prometheus text
+exposition format served at /metrics.
+
+This is a small self-contained registry rather than prometheus_client: the
+API only needs counters and histograms, and it keeps the dependency list
+unchanged. Metrics are per process; with several uvicorn workers each
+scrape sees the worker that answered it.
+
+Profiling: with PROFILE_REQUESTS=1, a request carrying `X-Profile: 1` runs
+its prediction work under cProfile; the stats are written to PROFILE_DIR
+as <timestamp>-<random id>-<label>.prof (never named after anything the
+client sent) and the top entries are logged with the request's ID.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from utils.log import request_id_var
+
+logger = logging.getLogger(__name__)
+
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+
+# Seconds; spans sub-millisecond feature work up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_profile_var: ContextVar[bool] = ContextVar("profile_request", default=False)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[i] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(_label_key(labels), ()))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        metric = Counter(name, documentation)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_counter_collector(self, name: str, documentation: str, collect: Callable[[], Dict[LabelKey, float]]):
+        """Expose counts kept elsewhere (e.g. a cache's own stats) as a counter at scrape time."""
+
+        def render() -> List[str]:
+            lines = [f"# HELP {name} {documentation}", f"# TYPE {name} counter"]
+            lines.extend(f"{name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(collect().items()))
+            return lines
+
+        self._collectors.append(render)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                lines.extend(collect())
+            except Exception as e:
+                logger.warning("Metrics collector failed: %s", e)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_seconds = REGISTRY.histogram(
+    "nba_http_request_duration_seconds", "HTTP request latency by route, method and status."
+)
+stage_seconds = REGISTRY.histogram(
+    "nba_stage_duration_seconds", "Time spent in each stage of the prediction path."
+)
+upstream_seconds = REGISTRY.histogram(
+    "nba_upstream_request_duration_seconds", "Latency of stats.nba.com calls by endpoint."
+)
+upstream_requests = REGISTRY.counter(
+    "nba_upstream_requests_total", "stats.nba.com calls by endpoint and outcome (ok, http_<status>, timeout, error)."
+)
+cache_requests = REGISTRY.counter(
+    "nba_cache_requests_total", "Cache lookups by cache and result (hit, miss)."
+)
+
+
+def stage(name: str):
+    """Context manager timing one stage of request handling."""
+    return stage_seconds.time(stage=name)
+
+
+_live_caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+
+def add_cache_collector(name: str, get_stats: Callable[[], Dict[str, int]]):
+    """Expose a LiveCache's counters as nba_live_cache_events_total{cache=name,...}."""
+    _live_caches[name] = get_stats
+
+
+def _collect_live_caches() -> Dict[LabelKey, float]:
+    out = {}
+    for cache, get_stats in _live_caches.items():
+        for event, value in get_stats().items():
+            if event != "size":
+                out[_label_key({"cache": cache, "event": event})] = value
+    return out
+
+
+REGISTRY.add_counter_collector(
+    "nba_live_cache_events_total",
+    "Live-data cache events (hits, stale_hits, misses, evictions, expirations) by cache.",
+    _collect_live_caches,
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+@contextmanager
+def maybe_profile(label: str):
+    """Run the block under cProfile if the current request asked for it."""
+    if not _profile_var.get():
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}-{label}.prof"
+        profiler.dump_stats(str(path))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(20)
+        logger.info("Profile for %s (request %s) written to %s\n%s", label, request_id_var.get(), path, summary.getvalue())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and opting requests into profiling."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+        token = None
+        if PROFILE_REQUESTS and (b"x-profile", b"1") in scope.get("headers", []):
+            token = _profile_var.set(True)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                route=getattr(route, "path", "unmatched"),
+                method=scope.get("method", ""),
+                status=status["code"],
+            )
+            if token is not None:
+                _profile_var.reset(token)
@@ -1,22 +1,87 @@
+import json
+import os
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-import time
 
 from nba_api.stats.endpoints import (
     playergamelog,
     leaguedashteamstats,
     leaguedashplayerstats
 )
+from nba_api.stats.library.http import NBAStatsHTTP
 from nba_api.stats.static import players, teams
 
+from services.fetch_scheduler import FetchScheduler, ResponseCache, UpstreamHTTPError
+
+
+# -----------------------------
+# Upstream Fetch Scheduler
+# -----------------------------
+# All stats.nba.com calls share one token bucket (NBA_API_RATE calls/sec)
+# across NBA_API_WORKERS threads and retry timeouts/429s with backoff. The
+# build entry points cache responses for completed seasons on disk under
+# NBA_API_CACHE_DIR (set it empty to disable); anything that can still
+# change (the current season, incremental fetches) always hits the API.
+# NBA_STATS_BASE_URL points nba_api at a local stub instead of stats.nba.com.
+if os.getenv("NBA_STATS_BASE_URL"):
+    NBAStatsHTTP.base_url = os.getenv("NBA_STATS_BASE_URL").rstrip("/") + "/{endpoint}"
+
+NBA_API_TIMEOUT = float(os.getenv("NBA_API_TIMEOUT", "30"))
+_cache_dir = os.getenv("NBA_API_CACHE_DIR", "nba_api_cache")
+_cache_ttl = float(os.getenv("NBA_API_CACHE_TTL_HOURS", "12")) * 3600
+scheduler = FetchScheduler(
+    rate=float(os.getenv("NBA_API_RATE", "1.5")),
+    max_workers=int(os.getenv("NBA_API_WORKERS", "4")),
+    max_retries=int(os.getenv("NBA_API_MAX_RETRIES", "4")),
+)
+
+
+def enable_response_cache():
+    """Attach the on-disk response cache to the scheduler.
+
+    Called by the build entry points rather than at import, so importing this
+    module (main.py does) creates no cache directory.
+    """
+    if _cache_dir and scheduler.cache is None:
+        scheduler.cache = ResponseCache(_cache_dir, ttl=_cache_ttl)
+
+
+def season_completed(season, today=None):
+    """True once `season` (e.g. "2023-24") is over, playoffs included."""
+    return (today or date.today()) >= date(int(season[:4]) + 1, 7, 1)
+
+
+def _call_endpoint(endpoint_cls, **params):
+    """Request an nba_api endpoint and return its first result set.
+
+    nba_api does not raise on HTTP errors (it fails later parsing the body),
+    so surface the status code for the scheduler's retry logic.
+    """
+    endpoint = endpoint_cls(timeout=NBA_API_TIMEOUT, get_request=False, **params)
+    try:
+        endpoint.get_request()
+    except Exception as e:
+        response = getattr(endpoint, "nba_response", None)
+        status = getattr(response, "_status_code", None)
+        if status is not None and status != 200:
+            raise UpstreamHTTPError(status) from e
+        raise
+    return endpoint.get_data_frames()[0]
+
 
 # -----------------------------
 # Get Top 50 Players (by PPG)
 # -----------------------------
 def get_top_50_players(season="2023-24"):
-    df = leaguedashplayerstats.LeagueDashPlayerStats(
-        season=season,
-        per_mode_detailed="PerGame"
-    ).get_data_frames()[0]
+    df = scheduler.fetch(
+        "leaguedashplayerstats",
+        {"endpoint_cls": leaguedashplayerstats.LeagueDashPlayerStats, "season": season, "per_mode_detailed": "PerGame"},
+        _call_endpoint,
+        use_cache=season_completed(season),
+    )
 
     df = df.sort_values("PTS", ascending=False)
     top_players = df.head(50)
@@ -27,15 +92,17 @@ def get_top_50_players(season="2023-24"):
 # -----------------------------
 # Convert Team Abbreviation → Team ID
 # -----------------------------
+@lru_cache(maxsize=1)
+def get_team_ids_by_abbrev():
+    """Abbreviation → team ID map, built once from nba_api's static team list."""
+    return {t["abbreviation"]: t["id"] for t in teams.get_teams()}
+
+
 def get_team_id_from_abbrev(abbrev):
     if abbrev is None:
         return None
 
-    all_teams = teams.get_teams()
-    for t in all_teams:
-        if t["abbreviation"] == abbrev:
-            return t["id"]
-    return None
+    return get_team_ids_by_abbrev().get(abbrev)
 
 
 # -----------------------------
@@ -43,6 +110,12 @@ def get_team_id_from_abbrev(abbrev):
 # -----------------------------
 SEASONS = ["2021-22", "2022-23", "2023-24"]
 
+# Output dataset, and the incremental-ingest state stored next to it:
+# high-water marks per (player, season) with the last GAME_DATE seen and
+# whether the player played that game (needed for the next injury flag).
+DATASET_CSV = "raw_nba_dataset.csv"
+INGEST_STATE_PATH = "ingest_state.json"
+
 
 # -----------------------------
 # Get All NBA Players
@@ -55,10 +128,16 @@ def get_all_players():
 # Get Team Defensive Ratings
 # -----------------------------
 def get_team_defensive_ratings(season):
-    df = leaguedashteamstats.LeagueDashTeamStats(
-        season=season,
-        measure_type_detailed_defense="Advanced"  # FIXED parameter name
-    ).get_data_frames()[0]
+    df = scheduler.fetch(
+        "leaguedashteamstats",
+        {
+            "endpoint_cls": leaguedashteamstats.LeagueDashTeamStats,
+            "season": season,
+            "measure_type_detailed_defense": "Advanced",  # FIXED parameter name
+        },
+        _call_endpoint,
+        use_cache=season_completed(season),
+    )
 
     return dict(zip(df["TEAM_ID"], df["DEF_RATING"]))
 
@@ -66,123 +145,399 @@ def get_team_defensive_ratings(season):
 # -----------------------------
 # Get Game Logs for a Player
 # -----------------------------
-def get_player_game_logs(season, player_id):
+def _game_log_job(season, player_id, date_from=None, use_cache=True):
+    """(key, endpoint, params, fetch_fn, use_cache) job for `scheduler.map`.
+
+    Only full logs of completed seasons are served from the response cache.
+    """
+    params = {
+        "endpoint_cls": playergamelog.PlayerGameLog,
+        "season": season,
+        "player_id": player_id,
+        "date_from_nullable": date_from.strftime("%m/%d/%Y") if date_from is not None else "",
+    }
+    use_cache = use_cache and date_from is None and season_completed(season)
+    return (season, player_id), "playergamelog", params, _call_endpoint, use_cache
+
+
+def get_player_game_logs(season, player_id, date_from=None):
+    """Fetch a player's game log; `date_from` (datetime/date) limits it to
+    games on or after that day. Returns None if it still fails after retries."""
+    _, endpoint, params, fetch_fn, use_cache = _game_log_job(season, player_id, date_from)
     try:
-        logs = playergamelog.PlayerGameLog(
-            season=season,
-            player_id=player_id
-        ).get_data_frames()[0]
-
-        time.sleep(0.6)  # avoid NBA API rate-limit
-        return logs
-
+        return scheduler.fetch(endpoint, params, fetch_fn, use_cache=use_cache)
     except Exception as e:
         print(f"Error fetching logs for Player {player_id}: {e}")
         return None
 
 
+def fetch_game_logs(jobs, use_cache=True):
+    """Fetch many game logs concurrently under the shared rate limit.
+
+    `jobs` are (season, player_id, date_from) tuples. Returns (logs, failures)
+    keyed by (season, player_id); failures are reported, never dropped silently.
+    `use_cache=False` bypasses the response cache for every job.
+    """
+    logs, failures = scheduler.map(
+        _game_log_job(season, pid, date_from, use_cache) for season, pid, date_from in jobs
+    )
+    for (season, pid), err in failures.items():
+        print(f"Error fetching logs for Player {pid} ({season}): {err}")
+    return logs, failures
+
+
+# -----------------------------
+# Convert One Player's Game Log → Dataset Rows
+# -----------------------------
+DATASET_COLUMNS = [
+    "player_id", "player_name", "season", "game_date", "pts", "min", "fg_pct",
+    "home", "opponent_id", "opp_def_rating", "injury_flag",
+]
+
+
+def transform_game_log_batch(logs_by_key, names, def_ratings, prev_played=None, after=None):
+    """Turn many PlayerGameLog frames into dataset rows in one vectorized pass.
+
+    `logs_by_key` maps (season, player_id) to its game log; rows come out in
+    that order, each player's games by date. `names` maps player_id to name,
+    `def_ratings` maps season to {team_id: DEF_RATING} and is only indexed for
+    seasons that yield rows. `prev_played` optionally maps a key to whether
+    the player played the game before its first row (default True), carrying
+    the injury-flag state across calls; `after` optionally maps a key to a
+    date, dropping games on or before it.
+
+    Returns (rows_df, marks) where marks maps each key that still had games to
+    (last game date, whether the player played it), the state a later
+    incremental run resumes from.
+    """
+    keys = [key for key, logs in logs_by_key.items() if logs is not None and not logs.empty]
+    if not keys:
+        return pd.DataFrame(columns=DATASET_COLUMNS), {}
+
+    # One frame for every log, tagged with the index of the key it came from
+    frames = [logs_by_key[key] for key in keys]
+    logs = pd.concat(frames, ignore_index=True)
+    group = np.repeat(np.arange(len(keys)), [len(f) for f in frames])
+    # GAME_DATE is text like "Apr 03, 2022"
+    dates = pd.to_datetime(logs["GAME_DATE"], errors="coerce")
+    if after:
+        cutoff = pd.to_datetime(pd.Series([after.get(key) for key in keys]))
+        keep = ~(dates.to_numpy() <= cutoff.to_numpy()[group])
+        logs, dates, group = logs[keep], dates[keep], group[keep]
+        if logs.empty:
+            return pd.DataFrame(columns=DATASET_COLUMNS), {}
+
+    # Chronological within each key, keys in the given order
+    order = np.lexsort((dates.to_numpy(), group))
+    logs = logs.iloc[order].reset_index(drop=True)
+    dates = dates.iloc[order].reset_index(drop=True)
+    group = group[order]
+    seasons = np.array([key[0] for key in keys], dtype=object)[group]
+    pids = np.array([key[1] for key in keys])[group]
+
+    # -----------------------------
+    # Parse home / away from MATCHUP
+    # MATCHUP example: "GSW vs. LAL" or "GSW @ LAL"
+    # -----------------------------
+    matchup = logs["MATCHUP"].astype(str)
+    home = matchup.str.contains(r" vs\.? ", regex=True).astype(int)
+
+    # -----------------------------
+    # Opponent abbreviation → team ID → defensive rating (per season)
+    # -----------------------------
+    parts = matchup.str.split(" ")
+    opponent_abbrev = parts.str[2].where(parts.str.len() == 3)
+    opp_id = opponent_abbrev.map(get_team_ids_by_abbrev())
+
+    # -----------------------------
+    # DNP (MIN is 0 or missing) and safe minute conversion
+    # -----------------------------
+    minutes = pd.to_numeric(logs["MIN"], errors="coerce")
+    dnp = (logs["MIN"].isna() | (minutes == 0)).to_numpy()
+    played = ~dnp
+
+    opp_def_rating = pd.Series(np.nan, index=logs.index)
+    for season in pd.unique(seasons[played]):
+        in_season = seasons == season
+        opp_def_rating[in_season] = opp_id[in_season].map(def_ratings[season])
+
+    # -----------------------------
+    # Injury flag: the previous game of the same key (or, for its first
+    # game, the carried-in state) was a DNP
+    # -----------------------------
+    first = np.r_[True, group[1:] != group[:-1]]
+    last = np.r_[group[1:] != group[:-1], True]
+    played_before = np.r_[True, played[:-1]]
+    carried = np.array([(prev_played or {}).get(key, True) for key in keys], dtype=bool)
+    played_before[first] = carried[group[first]]
+    injury_flag = (~played_before).astype(int)
+
+    rows = pd.DataFrame({
+        "player_id": pids,
+        "player_name": pd.Series(pids).map(names).to_numpy(),
+        "season": seasons,
+        "game_date": logs["GAME_DATE"],
+        "pts": logs["PTS"],
+        "min": minutes.fillna(0.0).astype(float),
+        "fg_pct": logs["FG_PCT"],
+        "home": home,
+        "opponent_id": opp_id,
+        "opp_def_rating": opp_def_rating,
+        "injury_flag": injury_flag,
+    })[played].reset_index(drop=True)
+
+    last_dates = dates.groupby(group).max()
+    marks = {keys[g]: (last_dates[g], bool(played[i])) for g, i in zip(group[last], np.flatnonzero(last))}
+    return rows, marks
+
+
+def transform_game_logs(logs, pid, pname, season, def_ratings, prev_played=True):
+    """Turn one PlayerGameLog frame into dataset rows.
+
+    Single-log form of `transform_game_log_batch`; the builds transform all
+    their logs in one batch. Returns (rows_df, prev_played).
+    """
+    key = (season, pid)
+    rows, marks = transform_game_log_batch({key: logs}, {pid: pname}, {season: def_ratings}, {key: prev_played})
+    return rows, marks[key][1] if key in marks else prev_played
+
+
 # -----------------------------
 # Build Raw Dataset
 # -----------------------------
 def build_raw_dataset():
+    enable_response_cache()
     print("Fetching Top 50 scorers...")
     top_50_ids = get_top_50_players("2023-24")
 
     # Only include the top 50 players
     all_players = [p for p in get_all_players() if p["id"] in top_50_ids]
 
-    rows = []
+    state = {"players": {str(p["id"]): p["full_name"] for p in all_players}, "high_water": {}}
 
+    print(f"Fetching {len(all_players) * len(SEASONS)} game logs...")
+    all_logs, failures = fetch_game_logs((season, p["id"], None) for season in SEASONS for p in all_players)
+
+    def_ratings = {}
     for season in SEASONS:
         print(f"Getting defensive ratings for {season}...")
-        def_ratings = get_team_defensive_ratings(season)
-
-        for p in all_players:
-            pid = p["id"]
-            pname = p["full_name"]
-
-            logs = get_player_game_logs(season, pid)
-            if logs is None or logs.empty:
-                continue
-
-            # Ensure chronological order
-            logs = logs.sort_values("GAME_DATE")
-
-            prev_played = True  # for injury flag detection
-
-            for _, row in logs.iterrows():
-
-                # -----------------------------
-                # Parse home / away from MATCHUP
-                # -----------------------------
-                matchup = row["MATCHUP"]
-                home = 1 if (" vs " in matchup or " vs. " in matchup) else 0
-
-                # -----------------------------
-                # Extract opponent abbreviation
-                # MATCHUP example: "GSW vs LAL" or "GSW @ LAL"
-                # -----------------------------
-                parts = matchup.split(" ")
-                opponent_abbrev = parts[2] if len(parts) == 3 else None
-                opp_id = get_team_id_from_abbrev(opponent_abbrev)
-
-                # -----------------------------
-                # Injury flag
-                # -----------------------------
-                if not prev_played:
-                    injury_flag = 1  # returning from injury
-                else:
-                    injury_flag = 0
-
-                # -----------------------------
-                # Handle DNP (if MIN is 0 or missing)
-                # -----------------------------
-                raw_min = row["MIN"]
-
-                if raw_min in ["0", 0, None]:
-                    prev_played = False
-                    continue
-                else:
-                    prev_played = True
-
-                # -----------------------------
-                # Safe minute conversion
-                # -----------------------------
-                try:
-                    minutes = float(raw_min)
-                except:
-                    minutes = 0.0
-
-                # -----------------------------
-                # Add row to dataset
-                # -----------------------------
-                rows.append({
-                    "player_id": pid,
-                    "player_name": pname,
-                    "season": season,
-                    "game_date": row["GAME_DATE"],
-                    "pts": row["PTS"],
-                    "min": minutes,
-                    "fg_pct": row["FG_PCT"],
-                    "home": home,
-                    "opponent_id": opp_id,
-                    "opp_def_rating": def_ratings.get(opp_id, None),
-                    "injury_flag": injury_flag
-                })
-
-    df = pd.DataFrame(rows)
-    df.to_csv("raw_nba_dataset.csv", index=False)
-
-    print("\n✅ Saved dataset as raw_nba_dataset.csv")
+        def_ratings[season] = get_team_defensive_ratings(season)
+
+    ordered = {
+        (season, p["id"]): all_logs.get((season, p["id"])) for season in SEASONS for p in all_players
+    }
+    names = {p["id"]: p["full_name"] for p in all_players}
+    df, marks = transform_game_log_batch(ordered, names, def_ratings)
+    for (season, pid), (last_date, prev_played) in marks.items():
+        _record_high_water(state, pid, season, last_date, prev_played)
+
+    df.to_csv(DATASET_CSV, index=False)
+    save_ingest_state(state)
+
+    print(f"\n✅ Saved dataset as {DATASET_CSV}")
     print(f"Total rows collected: {len(df)}")
+    _report_failures(failures)
 
     return df
 
 
+# -----------------------------
+# Incremental Ingest
+# -----------------------------
+def _hwm_key(pid, season):
+    return f"{pid}|{season}"
+
+
+def _record_high_water(state, pid, season, last_date, prev_played):
+    if pd.isna(last_date):
+        return
+    state["high_water"][_hwm_key(pid, season)] = {
+        "last_game_date": last_date.strftime("%Y-%m-%d"),
+        "prev_played": bool(prev_played),
+    }
+
+
+def load_ingest_state(path=INGEST_STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_ingest_state(state, path=INGEST_STATE_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _state_from_csv(csv_path):
+    """Bootstrap high-water marks from an existing dataset (pre-state builds)."""
+    existing = pd.read_csv(csv_path, usecols=["player_id", "player_name", "season", "game_date"])
+    existing["game_date"] = pd.to_datetime(existing["game_date"], errors="coerce")
+    state = {"players": {}, "high_water": {}}
+    for (pid, season), group in existing.groupby(["player_id", "season"]):
+        state["players"][str(pid)] = group["player_name"].iloc[0]
+        state["high_water"][_hwm_key(pid, season)] = {
+            "last_game_date": group["game_date"].max().strftime("%Y-%m-%d"),
+            # The CSV only holds games that were played
+            "prev_played": True,
+        }
+    return state
+
+
+def update_raw_dataset(seasons=None, csv_path=DATASET_CSV, state_path=INGEST_STATE_PATH):
+    """Fetch only games newer than each player's high-water mark and append them.
+
+    Tracks the players of the last full build. Falls back to a full
+    `build_raw_dataset` when there is no existing dataset. Returns the new rows.
+    """
+    if not os.path.exists(csv_path):
+        print("No existing dataset, running a full build...")
+        return build_raw_dataset()
+
+    enable_response_cache()
+    state = load_ingest_state(state_path) or _state_from_csv(csv_path)
+    seasons = seasons or SEASONS
+
+    def _mark(pid, season):
+        return state["high_water"].get(_hwm_key(pid, season))
+
+    jobs = []
+    for season in seasons:
+        for pid_key in state["players"]:
+            mark = _mark(int(pid_key), season)
+            jobs.append((season, int(pid_key), pd.Timestamp(mark["last_game_date"]) if mark else None))
+    # Never from the cache: a cached log would hide games played since it was stored
+    all_logs, failures = fetch_game_logs(jobs, use_cache=False)
+
+    ordered, after, prev_played = {}, {}, {}
+    for season in seasons:
+        for pid_key in state["players"]:
+            key = (season, int(pid_key))
+            ordered[key] = all_logs.get(key)
+            mark = _mark(int(pid_key), season)
+            if mark:
+                # date_from is inclusive: drop games at or before the mark
+                after[key] = pd.Timestamp(mark["last_game_date"])
+                prev_played[key] = mark["prev_played"]
+    names = {int(pid_key): pname for pid_key, pname in state["players"].items()}
+    new_rows, marks = transform_game_log_batch(ordered, names, _SeasonRatings(), prev_played, after)
+    for (season, pid), (last_date, played) in marks.items():
+        _record_high_water(state, pid, season, last_date, played)
+
+    if not new_rows.empty:
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        new_rows = new_rows[list(columns)]
+        new_rows.to_csv(csv_path, mode="a", header=False, index=False)
+    save_ingest_state(state, state_path)
+
+    print(f"✅ Appended {len(new_rows)} new rows to {csv_path}")
+    _report_failures(failures)
+    return new_rows
+
+
+class _SeasonRatings(dict):
+    """Season → defensive ratings, fetched the first time a season is needed."""
+
+    def __missing__(self, season):
+        print(f"Getting defensive ratings for {season}...")
+        ratings = self[season] = get_team_defensive_ratings(season)
+        return ratings
+
+
+def _report_failures(failures):
+    """Print the (season, player) logs that failed after retries.
+
+    Their high-water marks are not advanced, so the next incremental run
+    fetches them again.
+    """
+    if not failures:
+        return
+    print(f"⚠️  {len(failures)} game logs failed after retries:")
+    for (season, pid), err in sorted(failures.items(), key=lambda kv: str(kv[0])):
+        print(f"   - player {pid}, {season}: {err}")
+
+
+# -----------------------------
+# Full-League Build (all players, many seasons)
+# -----------------------------
+def season_range(first, last):
+    """Season labels from `first` to `last` inclusive, e.g. 2021-22 .. 2023-24."""
+    start, end = int(first[:4]), int(last[:4])
+    return [f"{y}-{str(y + 1)[-2:]}" for y in range(start, end + 1)]
+
+
+LEAGUE_SEASONS = season_range(os.getenv("NBA_FIRST_SEASON", "2015-16"), SEASONS[-1])
+
+
+def get_season_players(season):
+    """Every player who appeared in `season`: {player_id: player_name}."""
+    df = scheduler.fetch(
+        "leaguedashplayerstats",
+        {"endpoint_cls": leaguedashplayerstats.LeagueDashPlayerStats, "season": season, "per_mode_detailed": "PerGame"},
+        _call_endpoint,
+        use_cache=season_completed(season),
+    )
+    return dict(zip(df["PLAYER_ID"].astype(int), df["PLAYER_NAME"]))
+
+
+def build_league_dataset(seasons=None, out_dir=None, buckets=None):
+    """Build the dataset for the whole league into partitioned storage.
+
+    Unlike `build_raw_dataset` (top-50 scorers, flat CSV), this covers every
+    player of every season in `seasons` and writes season × player-bucket
+    partitions that the API loads lazily (see PartitionedPlayerIndex).
+    """
+    from services.dataset_store import DEFAULT_BUCKETS, PARTITIONS_DIR, write_partitions
+    from services.preprocess import compute_rolling_features
+
+    enable_response_cache()
+    seasons = seasons or LEAGUE_SEASONS
+    rosters = {}
+    for season in seasons:
+        print(f"Fetching players for {season}...")
+        rosters[season] = get_season_players(season)
+
+    jobs = [(season, pid, None) for season in seasons for pid in rosters[season]]
+    print(f"Fetching {len(jobs)} game logs...")
+    all_logs, failures = fetch_game_logs(jobs)
+
+    def_ratings = {}
+    for season in seasons:
+        print(f"Getting defensive ratings for {season}...")
+        def_ratings[season] = get_team_defensive_ratings(season)
+    ordered = {(season, pid): all_logs.get((season, pid)) for season in seasons for pid in rosters[season]}
+    names = {pid: pname for season in seasons for pid, pname in rosters[season].items()}
+    df, _ = transform_game_log_batch(ordered, names, def_ratings)
+    df["game_date"] = pd.to_datetime(df["game_date"], errors="coerce")
+    df = compute_rolling_features(df.sort_values("game_date"))
+    root = write_partitions(df, out_dir or PARTITIONS_DIR, buckets or DEFAULT_BUCKETS)
+
+    print(f"\n✅ Saved {len(df)} rows for {df['player_id'].nunique()} players to {root}")
+    _report_failures(failures)
+    return df
+
+
 # -----------------------------
 # Trigger When Run Directly
 # -----------------------------
 if __name__ == "__main__":
-    print("Building dataset...")
-    build_raw_dataset()
+    import sys
+    from services.dataset_store import build_columnar, update_columnar
+
+    if "--league" in sys.argv:
+        print("Building full-league partitioned dataset...")
+        build_league_dataset()
+    elif "--incremental" in sys.argv:
+        print("Updating dataset incrementally...")
+        new_rows = update_raw_dataset()
+        print("Updating columnar format...")
+        update_columnar(new_rows)
+    else:
+        print("Building dataset...")
+        build_raw_dataset()
+        print("Converting to columnar format...")
+        build_columnar()
 
@@ -1,51 +1,49 @@
-"""Live NBA stats service using nba_api with simple in-memory caching.
+"""Live NBA stats service backed by stats.nba.com with in-memory caching.
 
 This module is intentionally standalone to avoid touching existing logic.
 """
-from datetime import datetime, timedelta
 from typing import Any, Dict, Tuple
+import os
 import time
-import requests
+import httpx
 from fastapi import HTTPException
-from nba_api.stats.endpoints import playercareerstats
 
-# Cache structure: {(player_id, season_key): {"ts": datetime, "data": dict}}
-_CACHE: Dict[Tuple[int, str], Dict[str, Any]] = {}
-_CACHE_TTL = timedelta(minutes=15)
+from services import upstream
+from services.fetch_scheduler import UpstreamHTTPError
+from services.live_cache import DiskStore, LiveCache, MemoryStore
+
+# Keyed by (player_id, season_key). Fresh for 15 min; older stats are served
+# while a refresh runs (up to an hour) or if the upstream fails (up to a day).
+# At most SEASON_STATS_CACHE_SIZE players are kept; SEASON_STATS_CACHE_DIR
+# switches to a file-backed store that workers can share (e.g. under /dev/shm).
+_CACHE_SIZE = int(os.getenv("SEASON_STATS_CACHE_SIZE", "1024"))
+_CACHE_DIR = os.getenv("SEASON_STATS_CACHE_DIR")
+_CACHE = LiveCache(
+    ttl=15 * 60,
+    stale_while_revalidate=3600,
+    stale_if_error=24 * 3600,
+    store=DiskStore(_CACHE_DIR, maxsize=_CACHE_SIZE) if _CACHE_DIR else MemoryStore(maxsize=_CACHE_SIZE),
+)
 
 
 def _rank_latest_row(df):
     if df is None or df.empty:
         raise ValueError("No season data")
-    return df.sort_values("SEASON_ID").iloc[-1]
+    # Records (not a row Series) so values are plain Python types for JSON
+    return df.sort_values("SEASON_ID").tail(1).to_dict(orient="records")[0]
 
 
 def _season_key_latest():
     return "latest"
 
 
-def _from_cache(key: Tuple[int, str]):
-    now = datetime.utcnow()
-    if key in _CACHE and now - _CACHE[key]["ts"] < _CACHE_TTL:
-        return _CACHE[key]["data"]
-    return None
-
-
-def _store_cache(key: Tuple[int, str], data: Dict[str, Any]):
-    _CACHE[key] = {"ts": datetime.utcnow(), "data": data}
-
-
-def get_player_latest_season_stats(player_id: int) -> Dict[str, Any]:
-    cache_key = (int(player_id), _season_key_latest())
-    cached = _from_cache(cache_key)
-    if cached:
-        return cached
-
+async def _fetch_latest_season_stats(player_id: int) -> Dict[str, Any]:
     try:
         start = time.time()
-        endpoint = playercareerstats.PlayerCareerStats(player_id=player_id, timeout=10)
+        data_frames = await upstream.client.get_data_frames(
+            "playercareerstats", {"PlayerID": player_id, "PerMode": "Totals", "LeagueID": ""}
+        )
         resp_time = time.time() - start
-        data_frames = endpoint.get_data_frames()
         if not data_frames:
             raise ValueError("Empty response")
         latest = _rank_latest_row(data_frames[0])
@@ -66,14 +64,23 @@ def get_player_latest_season_stats(player_id: int) -> Dict[str, Any]:
             "ft_pct": latest.get("FT_PCT"),
             "resp_time_sec": round(resp_time, 3),
         }
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="nba_api timeout")
-    except requests.exceptions.HTTPError as e:
-        if e.response is not None and e.response.status_code == 429:
+    except UpstreamHTTPError as e:
+        if e.status_code == 429:
             raise HTTPException(status_code=429, detail="nba_api rate limit")
         raise HTTPException(status_code=502, detail="nba_api HTTP error")
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"nba_api error: {e}")
-
-    _store_cache(cache_key, result)
     return result
+
+
+async def get_player_latest_season_stats(player_id: int) -> Dict[str, Any]:
+    cache_key: Tuple[int, str] = (int(player_id), _season_key_latest())
+    entry = await _CACHE.get(cache_key, lambda: _fetch_latest_season_stats(player_id))
+    return entry.value
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters and current size of the season-stats cache."""
+    return _CACHE.get_stats()
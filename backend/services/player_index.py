@@ -0,0 +1,193 @@
+"""Per-player index over the game-log dataset.
+
+Rows are sorted by (player_id, game_date) and an offset table maps each
+player to the contiguous row range holding their games, so a lookup is O(1)
+and returns read-only slices of the sorted columns.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _is_player_sorted(df: pd.DataFrame) -> bool:
+    """True if rows are already grouped by player_id and date-ordered within each."""
+    ids = df["player_id"].to_numpy()
+    dates = df["game_date"].to_numpy()
+    id_step = np.diff(ids)
+    return bool(np.all(id_step >= 0) and np.all((id_step > 0) | (np.diff(dates) >= np.timedelta64(0))))
+
+
+class PlayerIndex:
+    def __init__(self, df: pd.DataFrame, players: Optional[List[dict]] = None):
+        if df.empty:
+            self.frame = df
+            self.columns: Dict[str, np.ndarray] = {}
+            self.players: List[dict] = []
+            self.league_opp_def_mean: Optional[float] = None
+            self._offsets: Dict[int, Tuple[int, int]] = {}
+            return
+
+        if _is_player_sorted(df) and isinstance(df.index, pd.RangeIndex) and df.index.start == 0:
+            # Pre-sorted input (e.g. the memory-mapped columnar dataset): use
+            # it as-is so the slices stay views onto the original arrays.
+            ordered = df
+        else:
+            # Stable sort keeps the dataset's existing order for same-day rows
+            ordered = df.sort_values(["player_id", "game_date"], kind="mergesort").reset_index(drop=True)
+        ids = ordered["player_id"].to_numpy()
+        bounds = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(ids)]))
+
+        self.frame = ordered
+        self.columns = {col: ordered[col].to_numpy() for col in ordered.columns}
+        # Player catalog in the dataset's own order (first appearance)
+        if players is None:
+            players = df[["player_id", "player_name"]].drop_duplicates().to_dict(orient="records")
+        self.players = players
+        # League-wide mean opponent defensive rating (context for explanations)
+        opp_def = df["opp_def_rating"] if "opp_def_rating" in df.columns else None
+        self.league_opp_def_mean = None if opp_def is None or opp_def.isna().all() else float(opp_def.mean())
+        self._offsets = {
+            int(pid): (int(s), int(e)) for pid, s, e in zip(ids[starts], starts, ends)
+        }
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def column(self, player_id: int, name: str, last_n: Optional[int] = None) -> Optional[np.ndarray]:
+        """Return a read-only view of one column for the player's games."""
+        b = self._offsets.get(player_id)
+        if b is None:
+            return None
+        start, end = b
+        if last_n is not None:
+            start = max(start, end - last_n)
+        view = self.columns[name][start:end]
+        view.flags.writeable = False
+        return view
+
+    def arrays(self, player_id: int, names, last_n: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Return read-only views of the named columns present in the dataset."""
+        if player_id not in self._offsets:
+            return None
+        return {name: self.column(player_id, name, last_n) for name in names if name in self.columns}
+
+    def stacked(self, player_ids, names, last_n: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """The last `last_n` games of every player, gathered into (players, last_n) arrays.
+
+        Rows are right-aligned: slots before a player's first game repeat that
+        game. Also returns `lengths`, the number of real games in each row.
+        Every id must be in the index.
+        """
+        offsets = np.array([self._offsets[player_id] for player_id in player_ids], dtype=np.int64).reshape(-1, 2)
+        starts, ends = offsets[:, 0], offsets[:, 1]
+        rows = np.maximum(ends[:, None] - last_n + np.arange(last_n), starts[:, None])
+        lengths = np.minimum(ends - starts, last_n)
+        return {name: self.columns[name][rows] for name in names if name in self.columns}, lengths
+
+    def grouped(self, player_ids) -> list:
+        """`player_ids` in the order bulk lookups serve them best (here: unchanged)."""
+        return list(player_ids)
+
+
+class PartitionedPlayerIndex:
+    """PlayerIndex over a partitioned dataset (see dataset_store.write_partitions).
+
+    Only the player catalog is read up front. A player's games live in one
+    bucket per season; the first lookup for a bucket maps its partitions
+    across all seasons and indexes them, and at most `max_buckets` indexed
+    buckets are kept (least recently used are dropped).
+    """
+
+    def __init__(self, root, max_buckets: int = 16):
+        from services.dataset_store import read_manifest
+
+        self.root = root
+        self.manifest = read_manifest(root)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No partitioned dataset in {root}")
+        self.max_buckets = max(1, int(max_buckets))
+        self.players = [{"player_id": p["player_id"], "player_name": p["player_name"]} for p in self.manifest["players"]]
+        self.league_opp_def_mean = self.manifest.get("league_opp_def_mean")
+        self._bucket_of = {p["player_id"]: p["bucket"] for p in self.manifest["players"]}
+        self._loaded: "OrderedDict[int, PlayerIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._bucket_of
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def _bucket(self, player_id: int) -> Optional[PlayerIndex]:
+        bucket = self._bucket_of.get(player_id)
+        return None if bucket is None else self._load(bucket)
+
+    def _load(self, bucket: int) -> PlayerIndex:
+        from services.dataset_store import load_bucket
+
+        with self._lock:
+            index = self._loaded.get(bucket)
+            if index is not None:
+                self._loaded.move_to_end(bucket)
+                return index
+        # Load outside the lock; a racing duplicate load is harmless
+        index = PlayerIndex(load_bucket(self.root, bucket, self.manifest))
+        with self._lock:
+            self._loaded[bucket] = index
+            while len(self._loaded) > self.max_buckets:
+                self._loaded.popitem(last=False)
+        return index
+
+    def column(self, player_id: int, name: str, last_n: Optional[int] = None) -> Optional[np.ndarray]:
+        index = self._bucket(player_id)
+        return None if index is None else index.column(player_id, name, last_n)
+
+    def arrays(self, player_id: int, names, last_n: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        index = self._bucket(player_id)
+        return None if index is None else index.arrays(player_id, names, last_n)
+
+    def stacked(self, player_ids, names, last_n: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """`PlayerIndex.stacked` across buckets, loading each bucket once.
+
+        Players are gathered bucket by bucket, so a request spanning more
+        than `max_buckets` buckets does not evict and reload them.
+        """
+        positions: Dict[int, List[int]] = {}
+        for i, player_id in enumerate(player_ids):
+            positions.setdefault(self._bucket_of[player_id], []).append(i)
+        parts = []
+        for bucket, where in positions.items():
+            arrays, lengths = self._load(bucket).stacked([player_ids[i] for i in where], names, last_n)
+            parts.append((where, arrays, lengths))
+
+        lengths = np.zeros(len(player_ids), dtype=np.int64)
+        stacked: Dict[str, np.ndarray] = {}
+        for name in names:
+            if not all(name in arrays for _, arrays, _ in parts):
+                continue
+            dtype = np.result_type(*(arrays[name].dtype for _, arrays, _ in parts))
+            stacked[name] = np.empty((len(player_ids), last_n), dtype=dtype)
+        for where, arrays, part_lengths in parts:
+            lengths[where] = part_lengths
+            for name, values in stacked.items():
+                values[where] = arrays[name]
+        return stacked, lengths
+
+    def grouped(self, player_ids) -> list:
+        """`player_ids` reordered so players in the same bucket are adjacent.
+
+        Callers that look players up in chunks (e.g. streamed batches) then
+        load each bucket once instead of once per chunk.
+        """
+        first_seen: Dict[int, int] = {}
+        for player_id in player_ids:
+            first_seen.setdefault(self._bucket_of.get(player_id, -1), len(first_seen))
+        return sorted(player_ids, key=lambda player_id: first_seen[self._bucket_of.get(player_id, -1)])
@@ -0,0 +1,61 @@
+"""LRU cache of prediction payloads keyed by player and artifact version.
+
+The dataset and model artifacts only change on a refresh, so a prediction for
+a player is fully determined by (player_id, artifact version). The version is
+a fingerprint of the artifact files; when it changes the cache is dropped.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def artifact_version(*paths) -> str:
+    """Fingerprint files by name, size and mtime (missing files count too)."""
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            h.update(f"{path}:missing;".encode())
+    return h.hexdigest()[:16]
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(0, int(maxsize))
+        self.version: Optional[str] = None
+        self._data: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            self._data.clear()
+            self.version = version
+
+    def get(self, player_id: int, version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._check_version(version)
+            payload = self._data.get(player_id)
+            if payload is not None:
+                self._data.move_to_end(player_id)
+            return payload
+
+    def put(self, player_id: int, version: str, payload: Dict[str, Any]):
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._data[player_id] = payload
+            self._data.move_to_end(player_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,59 @@
+"""Feature preprocessing for the game-log dataset."""
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (source column, statistic, window). Add entries here to derive new features;
+# supported statistics are "mean", "std" and "ewm" (exponentially weighted mean
+# with span=window).
+ROLLING_FEATURES = [
+    ("pts", "mean", 5),
+    ("pts", "mean", 10),
+    ("min", "mean", 5),
+]
+
+
+def rolling_feature_name(column: str, stat: str, window: int) -> str:
+    """Column name for a rolling feature, e.g. pts_rolling_5 or pts_std_10."""
+    label = "rolling" if stat == "mean" else stat
+    return f"{column}_{label}_{window}"
+
+
+def compute_rolling_features(df: pd.DataFrame, features: Iterable[Tuple[str, str, int]] = ROLLING_FEATURES):
+    """Add rolling features per player, sorted by game_date.
+
+    Default features added:
+    - pts_rolling_5: rolling mean of pts over last 5 games
+    - pts_rolling_10: rolling mean of pts over last 10 games
+    - min_rolling_5: rolling mean of min over last 5 games
+
+    Computed per player in a single grouped pass over the frame, no data
+    leakage, NaNs forward-filled within each player.
+    """
+    if df.empty:
+        return df
+
+    # Lay rows out player by player (in order of first appearance), each
+    # player's games in date order, so the grouped windows run contiguously.
+    codes, _ = pd.factorize(df["player_id"])
+    order = np.lexsort((df["game_date"].to_numpy(), codes))
+    df = df.iloc[order].reset_index(drop=True)
+
+    groups = df.groupby("player_id", sort=False)
+    names = []
+    for column, stat, window in features:
+        if stat == "mean":
+            values = groups[column].rolling(window=window, min_periods=1).mean()
+        elif stat == "std":
+            values = groups[column].rolling(window=window, min_periods=1).std()
+        elif stat == "ewm":
+            values = groups[column].ewm(span=window, min_periods=1).mean()
+        else:
+            raise ValueError(f"Unsupported rolling statistic: {stat}")
+        name = rolling_feature_name(column, stat, window)
+        df[name] = values.reset_index(level=0, drop=True)
+        names.append(name)
+
+    df[names] = df.groupby("player_id", sort=False)[names].ffill()
+    return df.sort_values("game_date").reset_index(drop=True)
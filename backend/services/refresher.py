@@ -0,0 +1,107 @@
+"""Background refresh of live upstream data.
+
+Runs one asyncio task per job that re-fetches on its own interval (which can
+depend on the data, e.g. shorter during games), so requests find the
+scoreboard and standings caches warm. A failing job backs off exponentially
+until it succeeds again.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@dataclass
+class RefreshJob:
+    name: str
+    refresh: Callable[[], Awaitable[None]]
+    interval: Union[float, Callable[[], float]]
+    max_backoff: float = 900.0
+    last_refresh: Optional[float] = None
+    last_attempt: Optional[float] = None
+    last_error: Optional[str] = None
+    failures: int = 0
+    next_run: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def current_interval(self) -> float:
+        return self.interval() if callable(self.interval) else self.interval
+
+    def next_delay(self) -> float:
+        base = self.current_interval()
+        if self.failures == 0:
+            return base
+        return min(self.max_backoff, base * 2 ** self.failures)
+
+    def status(self) -> dict:
+        return {
+            "last_refresh": _iso(self.last_refresh),
+            "last_attempt": _iso(self.last_attempt),
+            "last_error": self.last_error,
+            "consecutive_failures": self.failures,
+            "next_run": _iso(self.next_run),
+        }
+
+
+class BackgroundRefresher:
+    def __init__(self):
+        self.jobs: List[RefreshJob] = []
+
+    def add(
+        self,
+        name: str,
+        refresh: Callable[[], Awaitable[None]],
+        interval: Union[float, Callable[[], float]],
+        max_backoff: float = 900.0,
+    ):
+        """Register `refresh` to run every `interval` seconds (a float or a callable)."""
+        self.jobs.append(RefreshJob(name, refresh, interval, max_backoff))
+
+    @property
+    def running(self) -> bool:
+        return any(job.task is not None and not job.task.done() for job in self.jobs)
+
+    async def _loop(self, job: RefreshJob):
+        while True:
+            job.last_attempt = time.time()
+            try:
+                await job.refresh()
+                job.last_refresh = time.time()
+                job.last_error = None
+                job.failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e) or type(e).__name__
+                logger.warning("Background refresh '%s' failed (%dx): %s", job.name, job.failures, job.last_error)
+            delay = job.next_delay()
+            job.next_run = time.time() + delay
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Start one task per job on the running event loop (runs each job right away)."""
+        for job in self.jobs:
+            if job.task is None or job.task.done():
+                job.task = asyncio.ensure_future(self._loop(job))
+
+    async def stop(self):
+        tasks = [job.task for job in self.jobs if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs:
+            job.task = None
+
+    def status(self) -> Dict[str, dict]:
+        return {job.name: job.status() for job in self.jobs}
@@ -0,0 +1,52 @@
+"""Read-only store shared by all uvicorn workers on a box.
+
+`prepare` is run once by the parent (start.sh) before the workers start: it
+writes the columnar dataset and the NumPy model weights as uncompressed .npy
+files under SHARED_STORE_DIR (ideally on tmpfs, e.g. /dev/shm). Each worker
+then memory-maps them read-only, so the per-player arrays and the weights
+exist once in memory no matter how many workers are running.
+
+    SHARED_STORE_DIR=/dev/shm/nba-predictor python -m services.shared_store
+"""
+import os
+import shutil
+from pathlib import Path
+
+from services.dataset_store import CSV_PATH, build_columnar
+
+DEFAULT_SHARED_STORE_DIR = "/dev/shm/nba-predictor"
+
+
+def dataset_dir(root) -> Path:
+    return Path(root) / "dataset"
+
+
+def model_dir(root) -> Path:
+    return Path(root) / "model"
+
+
+def _make_read_only(path: Path):
+    for child in path.iterdir():
+        if child.is_file():
+            child.chmod(0o444)
+
+
+def prepare(root=DEFAULT_SHARED_STORE_DIR, csv_path=CSV_PATH):
+    """Populate the shared store from the CSV and the exported model weights."""
+    from models.lstm_model import WEIGHTS_PATH, NumpyLSTMModel
+
+    root = Path(root)
+    # Rebuild from scratch: files are read-only once published
+    for sub in (dataset_dir(root), model_dir(root)):
+        if sub.exists():
+            shutil.rmtree(sub)
+    build_columnar(csv_path, dataset_dir(root))
+    NumpyLSTMModel.load(WEIGHTS_PATH).save_dir(model_dir(root))
+    _make_read_only(dataset_dir(root))
+    _make_read_only(model_dir(root))
+    return root
+
+
+if __name__ == "__main__":
+    out = prepare(os.getenv("SHARED_STORE_DIR") or DEFAULT_SHARED_STORE_DIR)
+    print(f"✅ Shared store ready at {out}")
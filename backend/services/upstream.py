@@ -0,0 +1,115 @@
+"""Async client for the stats.nba.com endpoints hit while serving requests.
+
+Makes the same HTTP calls as nba_api on the event loop through one pooled
+httpx.AsyncClient, with a timeout per endpoint, so a slow stats.nba.com does
+not hold threadpool slots that other routes need. The dataset build
+(services/nba_api_service.py) uses nba_api through the fetch scheduler.
+"""
+import os
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import pandas as pd
+
+from services import metrics
+from services.fetch_scheduler import UpstreamHTTPError
+
+# NBA_STATS_BASE_URL points both clients at a local stub instead of stats.nba.com
+STATS_BASE_URL = os.getenv("NBA_STATS_BASE_URL", "https://stats.nba.com/stats").rstrip("/")
+
+# Headers stats.nba.com expects from a browser (same as nba_api's defaults)
+STATS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/145.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Referer": "https://www.nba.com/",
+    "Origin": "https://www.nba.com",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+}
+
+# Seconds allowed per endpoint. The scoreboard backs the home page and has a
+# sample fallback, so it gets the shortest budget.
+DEFAULT_TIMEOUT = float(os.getenv("NBA_UPSTREAM_TIMEOUT", "10"))
+ENDPOINT_TIMEOUTS = {
+    "scoreboardv3": 5.0,
+    "leaguestandingsv3": DEFAULT_TIMEOUT,
+    "playercareerstats": DEFAULT_TIMEOUT,
+}
+MAX_CONNECTIONS = int(os.getenv("NBA_UPSTREAM_MAX_CONNECTIONS", "20"))
+
+
+class UpstreamClient:
+    """Pooled async HTTP client for stats.nba.com.
+
+    The httpx client is created on first use (inside the running event loop)
+    and closed from the app lifespan.
+    """
+
+    def __init__(
+        self,
+        base_url: str = STATS_BASE_URL,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_connections: int = MAX_CONNECTIONS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = dict(ENDPOINT_TIMEOUTS if timeouts is None else timeouts)
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=STATS_HEADERS,
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_json(self, endpoint: str, params: dict) -> dict:
+        """GET `endpoint` and return the decoded JSON body.
+
+        Raises UpstreamHTTPError on a non-2xx status and httpx.TimeoutException
+        when the endpoint's timeout is exceeded.
+        """
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        # nba_api sends parameters sorted by key; some endpoints care
+        query = sorted((k, "" if v is None else v) for k, v in params.items())
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            resp = await self._get_client().get(f"{self.base_url}/{endpoint}", params=query, timeout=timeout)
+            if resp.status_code >= 400:
+                outcome = f"http_{resp.status_code}"
+                raise UpstreamHTTPError(resp.status_code)
+            data = resp.json()
+            outcome = "ok"
+            return data
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            metrics.upstream_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+            metrics.upstream_requests.inc(endpoint=endpoint, outcome=outcome)
+
+    async def get_data_frames(self, endpoint: str, params: dict) -> List[pd.DataFrame]:
+        """Return the endpoint's result sets as DataFrames (like nba_api's get_data_frames)."""
+        data = await self.get_json(endpoint, params)
+        result_sets = data.get("resultSets", data.get("resultSet", []))
+        if isinstance(result_sets, dict):
+            result_sets = [result_sets]
+        return [pd.DataFrame(rs["rowSet"], columns=rs["headers"]) for rs in result_sets]
+
+
+client = UpstreamClient()
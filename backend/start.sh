@@ -19,7 +19,22 @@
 # Use PORT environment variable provided by Render
 PORT=${PORT:-8000}
 
-echo "Starting NBA Performance Predictor API on port $PORT..."
+# Number of uvicorn worker processes (Render sets WEB_CONCURRENCY)
+WORKERS=${WEB_CONCURRENCY:-1}
+
+if [ "$WORKERS" -gt 1 ]; then
+    # Multi-worker: prepare the dataset and NumPy model weights once in a
+    # shared read-only store; every worker memory-maps the same pages.
+    export SHARED_STORE_DIR=${SHARED_STORE_DIR:-/dev/shm/nba-predictor}
+    export INFERENCE_BACKEND=${INFERENCE_BACKEND:-numpy}
+    python -m services.shared_store || { echo "Shared store preparation failed, starting without it"; unset SHARED_STORE_DIR; }
+else
+    # Convert the CSV dataset into the memory-mapped columnar format so workers
+    # skip CSV parsing at boot (main.py falls back to the CSV if this fails)
+    python -m services.dataset_store || echo "Columnar dataset build failed, workers will load the CSV"
+fi
+
+echo "Starting NBA Performance Predictor API on port $PORT with $WORKERS worker(s)..."
 
 # Start uvicorn with the PORT from environment
-exec uvicorn main:app --host 0.0.0.0 --port $PORT
+exec uvicorn main:app --host 0.0.0.0 --port $PORT --workers $WORKERS
@@ -0,0 +1,82 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Tests import the backend modules the way the app does (services.*, main)
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services import dataset_store  # noqa: E402
+from services.preprocess import compute_rolling_features  # noqa: E402
+
+
+
+@pytest.fixture(scope="session")
+def app_main():
+    """The app module, loaded from the checked-in CSV and NumPy weights."""
+    os.environ.setdefault("INFERENCE_BACKEND", "numpy")
+    os.environ.setdefault("INFERENCE_BATCH_WINDOW_MS", "0")
+    # Artifact paths in main are relative to the backend directory
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        return importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def client(app_main, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.chdir(BACKEND_DIR)
+    app_main.prediction_cache.clear()
+    return TestClient(app_main.app)
+
+
+# Synthetic partitioned dataset: 40 players over 3 seasons, 8 buckets
+SEASONS = ["2019-20", "2020-21", "2021-22"]
+BUCKETS = 8
+
+
+@pytest.fixture
+def partitions(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = []
+    for player_id in range(1, 41):
+        for s, season in enumerate(SEASONS):
+            for game in range(6):
+                rows.append({
+                    "player_id": player_id,
+                    "player_name": f"Player {player_id}",
+                    "season": season,
+                    "game_date": pd.Timestamp(2019 + s, 11, 1) + pd.Timedelta(days=3 * game),
+                    "pts": int(rng.integers(0, 40)),
+                    "min": float(rng.uniform(10, 40)),
+                    "fg_pct": float(rng.uniform(0.3, 0.6)),
+                    "home": int(rng.integers(0, 2)),
+                    "opponent_id": 1610612737,
+                    "opp_def_rating": float(rng.uniform(105, 120)),
+                    "injury_flag": 0,
+                })
+    df = compute_rolling_features(pd.DataFrame(rows))
+    return dataset_store.write_partitions(df, tmp_path / "partitions", BUCKETS)
+
+
+@pytest.fixture
+def bucket_loads(monkeypatch):
+    loads = []
+    load_bucket = dataset_store.load_bucket
+
+    def counting(root, bucket, manifest=None):
+        loads.append(bucket)
+        return load_bucket(root, bucket, manifest)
+
+    monkeypatch.setattr(dataset_store, "load_bucket", counting)
+    return loads
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from routers import games
+from services import upstream
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    games._cache.clear()
+    yield
+    games._cache.clear()
+
+
+def _scoreboard(*game_ids):
+    return {"scoreboard": {"games": [{"gameId": gid, "homeTeam": {}, "awayTeam": {}} for gid in game_ids]}}
+
+
+def test_failed_scoreboard_is_not_cached_as_sample_games(monkeypatch):
+    async def failing(endpoint, params):
+        raise ConnectionError("stats.nba.com unreachable")
+
+    monkeypatch.setattr(upstream.client, "get_json", failing)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(games.refresh_games())
+    assert games._cache.peek("games") is None
+
+    served = asyncio.run(games.get_games())
+    assert [g["game_id"] for g in served] == ["sample-final", "sample-upcoming"]
+    assert games._cache.peek("games") is None
+
+
+def test_partial_scoreboard_is_cached(monkeypatch):
+    calls = []
+
+    async def one_date_fails(endpoint, params):
+        calls.append(params["GameDate"])
+        if len(calls) == 1:
+            raise ConnectionError("timeout")
+        return _scoreboard(f"g{len(calls)}")
+
+    monkeypatch.setattr(upstream.client, "get_json", one_date_fails)
+
+    served = asyncio.run(games.get_games())
+
+    assert sorted(g["game_id"] for g in served) == ["g2", "g3"]
+    assert games._cache.peek("games").value == served
+
+
+def test_empty_scoreboard_serves_sample_games(monkeypatch):
+    async def no_games(endpoint, params):
+        return _scoreboard()
+
+    monkeypatch.setattr(upstream.client, "get_json", no_games)
+
+    served = asyncio.run(games.get_games())
+
+    assert [g["game_id"] for g in served] == ["sample-final", "sample-upcoming"]
+    assert games._cache.peek("games").value == []
+
+
+def test_cache_stats_counts_scoreboard_lookups(monkeypatch):
+    async def one_game(endpoint, params):
+        return _scoreboard("g1")
+
+    monkeypatch.setattr(upstream.client, "get_json", one_game)
+    before = games.cache_stats()
+
+    asyncio.run(games.get_games())
+    asyncio.run(games.get_games())
+
+    stats = games.cache_stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["size"] == 1
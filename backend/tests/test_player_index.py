@@ -0,0 +1,40 @@
+import numpy as np
+
+from conftest import BUCKETS, SEASONS
+from services.player_index import PartitionedPlayerIndex
+
+def test_stacked_loads_each_bucket_once(partitions, bucket_loads):
+    # Fewer cached buckets than the request spans: one-at-a-time lookups in
+    # catalog order (ids 1, 2, 3, ... cycle through the buckets) would thrash
+    index = PartitionedPlayerIndex(partitions, max_buckets=2)
+    player_ids = [p["player_id"] for p in index.players]
+
+    stacked, lengths = index.stacked(player_ids, ("pts", "game_date"), last_n=5)
+
+    assert sorted(bucket_loads) == list(range(BUCKETS))
+    assert stacked["pts"].shape == (len(player_ids), 5)
+    np.testing.assert_array_equal(lengths, 5)
+    for i, player_id in enumerate(player_ids):
+        np.testing.assert_array_equal(stacked["pts"][i], index.arrays(player_id, ("pts",), last_n=5)["pts"])
+
+
+def test_stacked_pads_short_histories_with_first_game(partitions):
+    index = PartitionedPlayerIndex(partitions)
+    games = 6 * len(SEASONS)
+
+    stacked, lengths = index.stacked([9, 1], ("pts",), last_n=games + 2)
+
+    assert list(lengths) == [games, games]
+    for row, player_id in zip(stacked["pts"], [9, 1]):
+        pts = index.arrays(player_id, ("pts",))["pts"]
+        np.testing.assert_array_equal(row, np.concatenate([pts[:1], pts[:1], pts]))
+
+
+def test_grouped_keeps_bucket_neighbours_together(partitions):
+    index = PartitionedPlayerIndex(partitions)
+    player_ids = [p["player_id"] for p in index.players]
+
+    buckets = [pid % BUCKETS for pid in index.grouped(player_ids)]
+
+    assert sorted(index.grouped(player_ids)) == sorted(player_ids)
+    assert sum(a != b for a, b in zip(buckets, buckets[1:])) == BUCKETS - 1
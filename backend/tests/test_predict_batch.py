@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from conftest import BUCKETS
+from services.player_index import PartitionedPlayerIndex
+
+
+def test_batch_all_loads_each_bucket_once(app_main, client, partitions, bucket_loads, monkeypatch):
+    monkeypatch.setattr(app_main, "player_index", PartitionedPlayerIndex(partitions, max_buckets=2))
+
+    response = client.post("/predict/batch", json={"player_ids": "all"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["predictions"]) == 40
+    assert body["not_found"] == []
+    assert sorted(bucket_loads) == list(range(BUCKETS))
+
+
+def test_batch_stream_all_loads_each_bucket_once(app_main, client, partitions, bucket_loads, monkeypatch):
+    monkeypatch.setattr(app_main, "player_index", PartitionedPlayerIndex(partitions, max_buckets=2))
+
+    response = client.post("/predict/batch/stream", json={"player_ids": "all"})
+
+    assert response.status_code == 200
+    done = [line for line in response.text.splitlines() if line.startswith("data:")][-1]
+    assert json.loads(done[len("data:"):])["count"] == 40
+    assert sorted(bucket_loads) == list(range(BUCKETS))
+
+
+def test_batch_dedupes_ids_in_request_order(client):
+    response = client.post("/predict/batch", json={"player_ids": [2544, "203507", 2544, 1]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["player_id"] for p in body["predictions"]] == [2544, 203507]
+    assert body["not_found"] == [1]
+
+
+@pytest.mark.parametrize("player_ids", [[1.7], [2544.0], [True], [False], ["1.5"], ["-3"], [" 2544"], [None], [[2544]]])
+def test_batch_rejects_non_integer_ids(client, player_ids):
+    response = client.post("/predict/batch", json={"player_ids": player_ids})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("payload", [{"player_ids": 0}, {"player_ids": ""}, {"player_ids": False}, {"player_ids": 2544}])
+def test_batch_rejects_non_list_ids(client, payload):
+    response = client.post("/predict/batch", json=payload)
+
+    assert response.status_code == 422
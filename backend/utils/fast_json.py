@@ -0,0 +1,55 @@
+"""Opt-in orjson encoding for the hot JSON responses.
+
+Routes with a response_model already skip jsonable_encoder: FastAPI
+validates the returned dict against the model and encodes it with
+pydantic's serializer. With FAST_JSON=1 and orjson installed, `respond()`
+wraps the dict in a response orjson renders directly, which also skips the
+validation (the dicts are built by our own code, in the model's shape).
+Without orjson, FAST_JSON=1 logs a warning and changes nothing.
+
+`dumps()` is the same choice for bodies encoded ahead of time
+(utils/http_cache.py).
+"""
+import json
+import logging
+import os
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+if FAST_JSON and orjson is None:
+    logger.warning("FAST_JSON=1 but orjson is not installed; using the standard JSON encoder")
+    FAST_JSON = False
+
+# numpy scalars/arrays as numbers, int dict keys as strings (as jsonable_encoder does)
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def dumps(data: Any) -> bytes:
+    """JSON bytes for `data`, with orjson under FAST_JSON, else like FastAPI's JSONResponse."""
+    if FAST_JSON:
+        return orjson.dumps(data, option=ORJSON_OPTIONS)
+    return json.dumps(
+        jsonable_encoder(data), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def respond(data: Any):
+    """Return value for a route with a response_model: orjson-rendered under FAST_JSON."""
+    if FAST_JSON:
+        return FastJSONResponse(data)
+    return data
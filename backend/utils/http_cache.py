@@ -0,0 +1,95 @@
+"""Pre-encoded JSON responses with strong ETags and conditional GET.
+
+Responses that only change when the dataset reloads (player catalog, a
+player's recent games) or when a cached upstream value is refetched
+(standings) are encoded once per version and kept as bytes. Requests get
+those bytes back with an ETag and Cache-Control, or an empty 304 if their
+If-None-Match already names the ETag.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+
+from utils import fast_json
+
+
+@dataclass(frozen=True)
+class Encoded:
+    body: bytes
+    etag: str
+
+
+def encode(data: Any) -> Encoded:
+    """Encode `data` (see utils/fast_json.py) and tag the bytes with a strong ETag."""
+    body = fast_json.dumps(data)
+    return Encoded(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+class ResponseCache:
+    """LRU of encoded responses for one version; a new version drops them all."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(0, int(maxsize))
+        self.version: Optional[str] = None
+        self._data: "OrderedDict[Hashable, Encoded]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, version: str, build: Callable[[], Any]) -> Encoded:
+        """Return the encoded response for `key`, calling `build()` on a miss.
+
+        Whatever `build` raises (e.g. HTTPException for an unknown player)
+        propagates and nothing is cached.
+        """
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+            encoded = self._data.get(key)
+            if encoded is not None:
+                self._data.move_to_end(key)
+                return encoded
+
+        # Encode outside the lock; a racing duplicate encode is harmless
+        encoded = encode(build())
+        if self.maxsize == 0:
+            return encoded
+        with self._lock:
+            if version == self.version:
+                self._data[key] = encoded
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return encoded
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: weak comparison, so W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def respond(request: Request, encoded: Encoded, cache_control: str) -> Response:
+    """200 with the encoded body, or 304 if the client already has it."""
+    headers = {"ETag": encoded.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(encoded.body, media_type="application/json", headers=headers)
@@ -0,0 +1,147 @@
+"""Structured, non-blocking logging for the API.
+
+Records go through a `QueueHandler`; a single background thread
+(`QueueListener`) formats and writes them, so request threads never block on
+stdout.
+
+* LOG_LEVEL sets the level (default INFO); LOG_FORMAT=json emits one JSON
+  object per line, otherwise a plain text line.
+* Every record carries the current request's correlation ID (taken from an
+  incoming X-Request-ID header, reduced to [A-Za-z0-9_-] and 64 characters,
+  or generated, and echoed on the response).
+* Per-request debug dumps (engineered/scaled features, final points) are
+  logged at DEBUG and only for a sampled fraction of requests
+  (LOG_DEBUG_SAMPLE_RATE, default 1.0 = every request when DEBUG is on).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+# Characters dropped from client-supplied request IDs before they are logged or echoed
+_UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+_sampled_var: ContextVar[Optional[bool]] = ContextVar("debug_sampled", default=None)
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        data = getattr(record, "data", None)
+        return line if data is None else f"{line} {json.dumps(data, default=str)}"
+
+
+class _ContextQueueHandler(QueueHandler):
+    """QueueHandler that stamps the request ID before the record leaves the request's context."""
+
+    def prepare(self, record):
+        record.request_id = request_id_var.get()
+        return super().prepare(record)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> QueueListener:
+    """Route the root logger through a queue to one background writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_ContextQueueHandler(log_queue))
+    # httpx logs every upstream request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return _listener
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def debug_sampled(logger: logging.Logger) -> bool:
+    """True if per-request debug dumps should be logged for the current request.
+
+    The sampling decision is made once per request so all of a request's
+    dumps appear together; outside a request each call is sampled on its own.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    sampled = _sampled_var.get()
+    if sampled is None:
+        return random.random() < LOG_DEBUG_SAMPLE_RATE
+    return sampled
+
+
+class RequestContextMiddleware:
+    """ASGI middleware assigning each HTTP request a correlation ID."""
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                request_id = _UNSAFE_ID_CHARS.sub("", value.decode("latin-1"))[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        id_token = request_id_var.set(request_id)
+        sample_token = _sampled_var.set(random.random() < LOG_DEBUG_SAMPLE_RATE)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(id_token)
+            _sampled_var.reset(sample_token)
@@ -0,0 +1,13 @@
+"""Server-sent events formatting for the streaming endpoints."""
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+MEDIA_TYPE = "text/event-stream"
+# Keep proxies (nginx, Render) from buffering the stream or caching it
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def event(name: str, data) -> str:
+    """One SSE message: `event: <name>` plus the JSON-encoded data."""
+    return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data), separators=(',', ':'))}\n\n"